@@ -1,3 +1,4 @@
+import os
 import sqlite3
 
 class GeoNamesCity(object):
@@ -28,9 +29,14 @@ class GeoName(object):
 
 class GeoNamesProvider(object):
     def __init__(self, geonames_db):
+        self.geonames_db = geonames_db
         self.cnn = sqlite3.connect(geonames_db)
         self.cursor = self.cnn.cursor()
 
+    def get_database_stamp(self):
+        stat = os.stat(self.geonames_db)
+        return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
     def find_city(self, name, country_name):
         cities = self.__find_cities(name)
         if not any(cities):
@@ -82,16 +88,19 @@ class GeoNamesProvider(object):
         return [GeoNamesCity(c) for c in self.cursor.fetchall()]
 
     def get_names_for_language(self, geoname_ids, language_code):
-        self.cursor.execute('SELECT geoname_id, name, priority FROM alt_name ' +
-                            'WHERE geoname_id IN ({0}) AND language = ?'.format(','.join(map(str, geoname_ids))),
-                            (language_code,))
-
-        items = self.cursor.fetchall()
-        names = dict()
-        for geoname_id in geoname_ids:
-            geoname_items = sorted([i for i in items if i[0] == geoname_id], key=lambda x: 0-x[2])
-            if any(geoname_items):
-                names[geoname_id] = geoname_items[0][1]
+        return self.get_names_for_languages(geoname_ids, [language_code])[language_code]
+
+    def get_names_for_languages(self, geoname_ids, language_codes):
+        language_codes = list(language_codes)
+        self.cursor.execute('SELECT geoname_id, language, name FROM alt_name ' +
+                            'WHERE geoname_id IN ({0}) AND language IN ({1}) '.format(
+                                ','.join(map(str, geoname_ids)), ','.join('?' * len(language_codes))) +
+                            'ORDER BY priority DESC, rowid',
+                            language_codes)
+
+        names = dict((language_code, dict()) for language_code in language_codes)
+        for geoname_id, language_code, name in self.cursor.fetchall():
+            names[language_code].setdefault(geoname_id, name)
 
         return names
 
@@ -0,0 +1,456 @@
+import json
+import struct
+import sys
+from array import array
+
+from pmetro.coords_codec import encode_polylines, decode_polylines, COORDS_SCALE
+from pmetro.entities import MapScheme, MapSchemeLine, MapSchemeStation, MapTransport, MapTransportLine
+
+TEXT_TABLE_MAGIC = b'AMTX'
+TEXT_TYPES_MAGIC = b'AMTT'
+TEXT_FORMAT_VERSION = 1
+
+# magic, version, reserved, count, blob size
+__TEXT_HEADER = struct.Struct('<4sHHII')
+
+
+def encode_text_table(texts):
+    blobs = []
+    offsets = [0]
+    for index, (text_id, text, text_type) in enumerate(texts):
+        if text_id != index:
+            raise ValueError('Text ids must be dense for binary table, found id %s at %s' % (text_id, index))
+        blob = text.encode('utf-8')
+        blobs.append(blob)
+        offsets.append(offsets[-1] + len(blob))
+
+    count = len(blobs)
+    return b''.join([
+        __TEXT_HEADER.pack(TEXT_TABLE_MAGIC, TEXT_FORMAT_VERSION, 0, count, offsets[-1]),
+        struct.pack('<%sI' % (count + 1), *offsets),
+        b''.join(blobs)
+    ])
+
+
+def decode_text_table(data):
+    magic, version, reserved, count, blob_size = __TEXT_HEADER.unpack_from(data, 0)
+    __ensure_header(magic, version, TEXT_TABLE_MAGIC)
+
+    offsets = struct.unpack_from('<%sI' % (count + 1), data, __TEXT_HEADER.size)
+    blob_start = __TEXT_HEADER.size + (count + 1) * 4
+    blob = bytes(data[blob_start:blob_start + blob_size])
+    return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+
+def encode_text_types(texts):
+    count = len(texts)
+    flags = bytearray((count + 7) // 8)
+    for index, (text_id, text, text_type) in enumerate(texts):
+        if text_id != index:
+            raise ValueError('Text ids must be dense for binary table, found id %s at %s' % (text_id, index))
+        if text_type:
+            flags[index >> 3] |= 1 << (index & 7)
+    return __TEXT_HEADER.pack(TEXT_TYPES_MAGIC, TEXT_FORMAT_VERSION, 0, count, len(flags)) + bytes(flags)
+
+
+def decode_text_types(data):
+    magic, version, reserved, count, flags_size = __TEXT_HEADER.unpack_from(data, 0)
+    __ensure_header(magic, version, TEXT_TYPES_MAGIC)
+
+    flags = data[__TEXT_HEADER.size:__TEXT_HEADER.size + flags_size]
+    return [(flags[i >> 3] >> (i & 7)) & 1 for i in range(count)]
+
+
+def write_binary_file(data, path):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def __ensure_header(magic, version, expected_magic):
+    if magic != expected_magic:
+        raise ValueError('Invalid binary table signature %s, expected %s' % (magic, expected_magic))
+    if version != TEXT_FORMAT_VERSION:
+        raise ValueError('Unsupported binary table version %s' % version)
+
+
+MODEL_FORMAT_VERSION = 2
+SCHEME_MAGIC = b'AMSC'
+TRANSPORT_MAGIC = b'AMTR'
+
+# magic, version, sections count
+__MODEL_HEADER = struct.Struct('<4sHH')
+# name, array type code, offset, items count
+__MODEL_SECTION = struct.Struct('<4s4sII')
+__MODEL_ALIGNMENT = 8
+
+__NONE_ID = -1
+
+__STATION_HAS_COORD = 1
+__STATION_HAS_RECT = 2
+__STATION_IS_WORKING = 4
+
+__SEGMENT_IS_WORKING = 1
+__TRANSPORT_SEGMENT_HAS_DELAY = 1
+
+__TRANSFER_IS_VISIBLE = 1
+__TRANSFER_HAS_DELAY = 2
+
+
+def encode_scheme(scheme, coords_codec=False):
+    line_index = array('i')
+    station_uids = array('i')
+    station_text_ids = array('i')
+    station_flags = array('B')
+    station_coords = array('i')
+    station_rects = array('i')
+    segment_ends = array('i')
+    segment_flags = array('B')
+    point_offsets = array('I', [0])
+    points = array('d')
+    point_int_flags = array('B')
+    point_count = 0
+    polylines = []
+
+    lines = []
+    for line in scheme.lines:
+        line_index.extend((len(station_uids), len(line.stations), len(segment_flags), len(line.segments)))
+        lines.append({
+            'name': line.name,
+            'text_id': line.text_id,
+            'line_color': line.line_color,
+            'line_width': line.line_width,
+            'labels_color': line.labels_color,
+            'labels_bg_color': line.labels_bg_color,
+            'station_names': [station.name for station in line.stations]
+        })
+
+        for station in line.stations:
+            flags = 0
+            station_uids.append(station.uid)
+            station_text_ids.append(__as_id(station.text_id))
+            if station.coord is not None:
+                flags |= __STATION_HAS_COORD
+                station_coords.extend(station.coord)
+            else:
+                station_coords.extend((0, 0))
+            if station.rect is not None:
+                flags |= __STATION_HAS_RECT
+                station_rects.extend(station.rect)
+            else:
+                station_rects.extend((0, 0, 0, 0))
+            if station.is_working:
+                flags |= __STATION_IS_WORKING
+            station_flags.append(flags)
+
+        for from_uid, to_uid, segment_points, is_working in line.segments:
+            segment_ends.extend((from_uid, to_uid))
+            segment_flags.append(__SEGMENT_IS_WORKING if is_working else 0)
+            for point in segment_points:
+                if point_count % 8 == 0:
+                    point_int_flags.append(0)
+                if all(isinstance(value, int) for value in point):
+                    point_int_flags[point_count >> 3] |= 1 << (point_count & 7)
+                point_count += 1
+            if coords_codec:
+                polylines.append(segment_points)
+                continue
+            for point in segment_points:
+                points.extend(point)
+            point_offsets.append(len(points) // 2)
+
+    transfer_ends = array('i')
+    transfer_flags = array('B')
+    transfer_coords = array('i')
+    for from_uid, to_uid, from_coord, to_coord in scheme.transfers:
+        transfer_ends.extend((from_uid, to_uid))
+        transfer_flags.append((1 if from_coord is not None else 0) | (2 if to_coord is not None else 0))
+        transfer_coords.extend(from_coord if from_coord is not None else (0, 0))
+        transfer_coords.extend(to_coord if to_coord is not None else (0, 0))
+
+    properties = {
+        'name': scheme.name,
+        'name_text_id': scheme.name_text_id,
+        'type_text_id': scheme.type_text_id,
+        'type_name': scheme.type_name,
+        'width': scheme.width,
+        'height': scheme.height,
+        'images': scheme.images,
+        'stations_diameter': scheme.stations_diameter,
+        'lines_width': scheme.lines_width,
+        'upper_case': scheme.upper_case,
+        'word_wrap': scheme.word_wrap,
+        'transports': scheme.transports,
+        'default_transports': scheme.default_transports,
+        'is_vector': scheme.is_vector,
+        'lines': lines
+    }
+    if any(scheme.image_tiles):
+        properties['image_tiles'] = scheme.image_tiles
+
+    if coords_codec:
+        properties['coords_scale'] = COORDS_SCALE
+        point_sections = [(b'GPTQ', array('B', encode_polylines(polylines)))]
+    else:
+        point_sections = [(b'GPTO', point_offsets), (b'GPTS', points)]
+
+    return __pack_sections(SCHEME_MAGIC, [
+        (b'PROP', __as_json_array(properties)),
+        (b'LINE', line_index),
+        (b'SUID', station_uids),
+        (b'STID', station_text_ids),
+        (b'SFLG', station_flags),
+        (b'SCRD', station_coords),
+        (b'SRCT', station_rects),
+        (b'GEND', segment_ends),
+        (b'GFLG', segment_flags),
+        (b'GPTI', point_int_flags)
+    ] + point_sections + [
+        (b'TEND', transfer_ends),
+        (b'TFLG', transfer_flags),
+        (b'TCRD', transfer_coords)
+    ])
+
+
+def decode_scheme(data):
+    sections = __unpack_sections(data, SCHEME_MAGIC)
+    properties = __from_json_array(sections[b'PROP'])
+
+    line_index = sections[b'LINE']
+    station_uids = sections[b'SUID']
+    station_text_ids = sections[b'STID']
+    station_flags = sections[b'SFLG']
+    station_coords = sections[b'SCRD']
+    station_rects = sections[b'SRCT']
+    segment_ends = sections[b'GEND']
+    segment_flags = sections[b'GFLG']
+    point_int_flags = sections[b'GPTI']
+
+    if b'GPTQ' in sections:
+        polylines = decode_polylines(sections[b'GPTQ'], properties['coords_scale'])
+    else:
+        point_offsets = sections[b'GPTO']
+        points = sections[b'GPTS']
+        polylines = [[tuple(points[p * 2:p * 2 + 2]) for p in range(point_offsets[i], point_offsets[i + 1])]
+                     for i in range(len(segment_flags))]
+
+    scheme = MapScheme()
+    for name in ['name', 'name_text_id', 'type_text_id', 'type_name', 'width', 'height', 'images',
+                 'stations_diameter', 'lines_width', 'upper_case', 'word_wrap', 'transports', 'default_transports',
+                 'is_vector']:
+        setattr(scheme, name, properties[name])
+    scheme.image_tiles = properties.get('image_tiles', dict())
+
+    scheme.lines = []
+    point_count = 0
+    for line_number, line_properties in enumerate(properties['lines']):
+        station_start, station_count, segment_start, segment_count = line_index[line_number * 4:line_number * 4 + 4]
+
+        stations = []
+        for i in range(station_start, station_start + station_count):
+            station = MapSchemeStation()
+            station.uid = station_uids[i]
+            station.name = line_properties['station_names'][i - station_start]
+            station.text_id = __from_id(station_text_ids[i])
+            flags = station_flags[i]
+            station.coord = tuple(station_coords[i * 2:i * 2 + 2]) if flags & __STATION_HAS_COORD else None
+            station.rect = tuple(station_rects[i * 4:i * 4 + 4]) if flags & __STATION_HAS_RECT else None
+            station.is_working = bool(flags & __STATION_IS_WORKING)
+            stations.append(station)
+
+        segments = []
+        for i in range(segment_start, segment_start + segment_count):
+            points = []
+            for point in polylines[i]:
+                if (point_int_flags[point_count >> 3] >> (point_count & 7)) & 1:
+                    point = tuple(int(round(value)) for value in point)
+                points.append(point)
+                point_count += 1
+            segments.append((segment_ends[i * 2], segment_ends[i * 2 + 1], points,
+                             bool(segment_flags[i] & __SEGMENT_IS_WORKING)))
+
+        scheme.lines.append(MapSchemeLine(
+            line_properties['name'],
+            line_properties['text_id'],
+            line_properties['line_color'],
+            line_properties['line_width'],
+            line_properties['labels_color'],
+            line_properties['labels_bg_color'],
+            stations,
+            segments
+        ))
+
+    transfer_ends = sections[b'TEND']
+    transfer_flags = sections[b'TFLG']
+    transfer_coords = sections[b'TCRD']
+    scheme.transfers = []
+    for i in range(len(transfer_flags)):
+        scheme.transfers.append((
+            transfer_ends[i * 2],
+            transfer_ends[i * 2 + 1],
+            tuple(transfer_coords[i * 4:i * 4 + 2]) if transfer_flags[i] & 1 else None,
+            tuple(transfer_coords[i * 4 + 2:i * 4 + 4]) if transfer_flags[i] & 2 else None))
+
+    return scheme
+
+
+def encode_transport(transport):
+    line_index = array('i')
+    station_uids = array('i')
+    station_text_ids = array('i')
+    segment_ends = array('i')
+    segment_delays = array('i')
+    segment_flags = array('B')
+
+    lines = []
+    for line in transport.lines:
+        line_index.extend((len(station_uids), len(line.stations), len(segment_delays), len(line.segments)))
+        lines.append({
+            'name': line.name,
+            'text_id': line.text_id,
+            'scheme': line.scheme,
+            'delays': line.delays,
+            'station_names': [name for uid, name, text_id in line.stations]
+        })
+
+        for uid, name, text_id in line.stations:
+            station_uids.append(uid)
+            station_text_ids.append(__as_id(text_id))
+
+        for from_uid, to_uid, delay in line.segments:
+            segment_ends.extend((from_uid, to_uid))
+            segment_delays.append(delay if delay is not None else 0)
+            segment_flags.append(__TRANSPORT_SEGMENT_HAS_DELAY if delay is not None else 0)
+
+    transfer_ends = array('i')
+    transfer_delays = array('i')
+    transfer_flags = array('B')
+    for from_uid, to_uid, delay, is_visible in transport.transfers:
+        transfer_ends.extend((from_uid, to_uid))
+        transfer_delays.append(delay if delay is not None else 0)
+        transfer_flags.append((__TRANSFER_IS_VISIBLE if is_visible else 0) |
+                              (__TRANSFER_HAS_DELAY if delay is not None else 0))
+
+    properties = {
+        'name': transport.name,
+        'type_name': transport.type_name,
+        'lines': lines
+    }
+
+    return __pack_sections(TRANSPORT_MAGIC, [
+        (b'PROP', __as_json_array(properties)),
+        (b'LINE', line_index),
+        (b'SUID', station_uids),
+        (b'STID', station_text_ids),
+        (b'GEND', segment_ends),
+        (b'GDLY', segment_delays),
+        (b'GFLG', segment_flags),
+        (b'TEND', transfer_ends),
+        (b'TDLY', transfer_delays),
+        (b'TFLG', transfer_flags)
+    ])
+
+
+def decode_transport(data):
+    sections = __unpack_sections(data, TRANSPORT_MAGIC)
+    properties = __from_json_array(sections[b'PROP'])
+
+    line_index = sections[b'LINE']
+    station_uids = sections[b'SUID']
+    station_text_ids = sections[b'STID']
+    segment_ends = sections[b'GEND']
+    segment_delays = sections[b'GDLY']
+    segment_flags = sections[b'GFLG']
+
+    lines = []
+    for line_number, line_properties in enumerate(properties['lines']):
+        station_start, station_count, segment_start, segment_count = line_index[line_number * 4:line_number * 4 + 4]
+
+        stations = [(station_uids[i],
+                     line_properties['station_names'][i - station_start],
+                     __from_id(station_text_ids[i])) for i in range(station_start, station_start + station_count)]
+
+        segments = [(segment_ends[i * 2],
+                     segment_ends[i * 2 + 1],
+                     segment_delays[i] if segment_flags[i] & __TRANSPORT_SEGMENT_HAS_DELAY else None)
+                    for i in range(segment_start, segment_start + segment_count)]
+
+        lines.append(MapTransportLine(
+            line_properties['name'],
+            line_properties['text_id'],
+            line_properties['scheme'],
+            stations,
+            segments,
+            line_properties['delays']
+        ))
+
+    transfer_ends = sections[b'TEND']
+    transfer_delays = sections[b'TDLY']
+    transfer_flags = sections[b'TFLG']
+    transfers = [(transfer_ends[i * 2],
+                  transfer_ends[i * 2 + 1],
+                  transfer_delays[i] if transfer_flags[i] & __TRANSFER_HAS_DELAY else None,
+                  bool(transfer_flags[i] & __TRANSFER_IS_VISIBLE)) for i in range(len(transfer_flags))]
+
+    return MapTransport(properties['name'], properties['type_name'], lines, transfers)
+
+
+def __pack_sections(magic, sections):
+    header_size = __MODEL_HEADER.size + __MODEL_SECTION.size * len(sections)
+    offset = __align(header_size)
+
+    table = []
+    chunks = []
+    for name, values in sections:
+        if sys.byteorder != 'little' and values.itemsize > 1:
+            values = array(values.typecode, values)
+            values.byteswap()
+        chunk = values.tobytes()
+        table.append(__MODEL_SECTION.pack(name, values.typecode.encode('ascii'), offset, len(values)))
+        chunks.append(chunk + b'\0' * (__align(len(chunk)) - len(chunk)))
+        offset += __align(len(chunk))
+
+    header = __MODEL_HEADER.pack(magic, MODEL_FORMAT_VERSION, len(sections)) + b''.join(table)
+    return b''.join([header, b'\0' * (__align(header_size) - header_size)] + chunks)
+
+
+def __unpack_sections(data, expected_magic):
+    magic, version, count = __MODEL_HEADER.unpack_from(data, 0)
+    if magic != expected_magic:
+        raise ValueError('Invalid binary model signature %s, expected %s' % (magic, expected_magic))
+    if version != MODEL_FORMAT_VERSION:
+        raise ValueError('Unsupported binary model version %s' % version)
+
+    view = memoryview(data)
+    sections = dict()
+    for i in range(count):
+        section_offset = __MODEL_HEADER.size + __MODEL_SECTION.size * i
+        name, typecode, offset, length = __MODEL_SECTION.unpack_from(data, section_offset)
+        typecode = typecode.rstrip(b'\0').decode('ascii')
+        item_size = array(typecode).itemsize
+        values = view[offset:offset + length * item_size]
+        if sys.byteorder != 'little' and item_size > 1:
+            values = array(typecode, values.tobytes())
+            values.byteswap()
+            values = memoryview(values)
+        sections[name] = values.cast(typecode)
+    return sections
+
+
+def __as_json_array(obj):
+    return array('B', json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+
+
+def __from_json_array(values):
+    return json.loads(values.tobytes().decode('utf-8'))
+
+
+def __as_id(value):
+    return __NONE_ID if value is None else value
+
+
+def __from_id(value):
+    return None if value == __NONE_ID else value
+
+
+def __align(size):
+    return (size + __MODEL_ALIGNMENT - 1) // __MODEL_ALIGNMENT * __MODEL_ALIGNMENT
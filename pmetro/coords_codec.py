@@ -0,0 +1,73 @@
+import base64
+
+COORDS_SCALE = 100
+
+
+def encode_polylines(polylines, scale=COORDS_SCALE):
+    data = bytearray()
+    for points in polylines:
+        __write_varint(data, len(points))
+        last_x = 0
+        last_y = 0
+        for x, y in points:
+            qx = int(round(x * scale))
+            qy = int(round(y * scale))
+            __write_varint(data, __zigzag(qx - last_x))
+            __write_varint(data, __zigzag(qy - last_y))
+            last_x = qx
+            last_y = qy
+    return bytes(data)
+
+
+def decode_polylines(data, scale=COORDS_SCALE):
+    polylines = []
+    pos = 0
+    length = len(data)
+    while pos < length:
+        count, pos = __read_varint(data, pos)
+        points = []
+        x = 0
+        y = 0
+        for i in range(count):
+            dx, pos = __read_varint(data, pos)
+            dy, pos = __read_varint(data, pos)
+            x += __unzigzag(dx)
+            y += __unzigzag(dy)
+            points.append((x / scale, y / scale))
+        polylines.append(points)
+    return polylines
+
+
+def encode_polylines_base64(polylines, scale=COORDS_SCALE):
+    return base64.b64encode(encode_polylines(polylines, scale)).decode('ascii')
+
+
+def decode_polylines_base64(text, scale=COORDS_SCALE):
+    return decode_polylines(base64.b64decode(text), scale)
+
+
+def __zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def __unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def __write_varint(data, value):
+    while value > 0x7f:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def __read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
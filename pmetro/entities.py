@@ -1,5 +1,8 @@
-
 class MapMetadata(object):
+    __slots__ = ('map_id', 'city_id', 'file', 'timestamp', 'latitude', 'longitude', 'description_text_id',
+                 'comments_text_id', 'delays', 'transport_types', 'transports', 'schemes', 'locales',
+                 'default_locale')
+
     def __init__(self, city_id, file_name, timestamp, latitude, longitude, description_text_id, comments_text_id):
         self.map_id = file_name
         self.city_id = city_id
@@ -16,8 +19,28 @@ class MapMetadata(object):
         self.locales = []
         self.default_locale = None
 
+    def to_primitive(self):
+        return {
+            'map_id': self.map_id,
+            'city_id': self.city_id,
+            'file': self.file,
+            'timestamp': self.timestamp,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'description_text_id': self.description_text_id,
+            'comments_text_id': self.comments_text_id,
+            'delays': self.delays,
+            'transport_types': self.transport_types,
+            'transports': self.transports,
+            'schemes': self.schemes,
+            'locales': self.locales,
+            'default_locale': self.default_locale
+        }
+
 
 class MapContainer(object):
+    __slots__ = ('meta', 'transports', 'schemes', 'images', 'texts')
+
     def __init__(self):
         self.meta = None
         self.transports = []
@@ -27,14 +50,26 @@ class MapContainer(object):
 
 
 class MapImage(object):
+    __slots__ = ('caption', 'line', 'station', 'image')
+
     def __init__(self):
         self.caption = ''
         self.line = ''
         self.station = ''
         self.image = ''
 
+    def to_primitive(self):
+        return {
+            'caption': self.caption,
+            'line': self.line,
+            'station': self.station,
+            'image': self.image
+        }
+
 
 class MapTransport(object):
+    __slots__ = ('name', 'type_name', 'lines', 'transfers')
+
     def __init__(self, name='', type_name='', lines=None, transfers=None):
         if not lines:
             lines = []
@@ -45,8 +80,18 @@ class MapTransport(object):
         self.lines = lines
         self.transfers = transfers
 
+    def to_primitive(self):
+        return {
+            'name': self.name,
+            'type_name': self.type_name,
+            'lines': self.lines,
+            'transfers': self.transfers
+        }
+
 
 class MapTransportLine(object):
+    __slots__ = ('name', 'text_id', 'scheme', 'stations', 'segments', 'delays')
+
     def __init__(self, name, text_id, scheme, stations, segments, delays):
         self.name = name
         self.text_id = text_id
@@ -55,8 +100,22 @@ class MapTransportLine(object):
         self.segments = segments
         self.delays = delays
 
+    def to_primitive(self):
+        return {
+            'name': self.name,
+            'text_id': self.text_id,
+            'scheme': self.scheme,
+            'stations': self.stations,
+            'segments': self.segments,
+            'delays': self.delays
+        }
+
 
 class MapScheme(object):
+    __slots__ = ('name', 'name_text_id', 'type_text_id', 'type_name', 'width', 'height', 'images',
+                 'stations_diameter', 'lines_width', 'upper_case', 'word_wrap', 'transports', 'default_transports',
+                 'lines', 'transfers', 'is_vector', 'image_tiles')
+
     def __init__(self):
         self.name = ''
         self.name_text_id = ''
@@ -72,11 +131,40 @@ class MapScheme(object):
         self.transports = []
         self.default_transports = []
         self.lines = []
+        self.transfers = []
         self.is_vector = True
+        self.image_tiles = dict()
+
+    def to_primitive(self):
+        primitive = {
+            'name': self.name,
+            'name_text_id': self.name_text_id,
+            'type_text_id': self.type_text_id,
+            'type_name': self.type_name,
+            'width': self.width,
+            'height': self.height,
+            'images': self.images,
+            'stations_diameter': self.stations_diameter,
+            'lines_width': self.lines_width,
+            'upper_case': self.upper_case,
+            'word_wrap': self.word_wrap,
+            'transports': self.transports,
+            'default_transports': self.default_transports,
+            'lines': self.lines,
+            'transfers': self.transfers,
+            'is_vector': self.is_vector
+        }
+        if any(self.image_tiles):
+            primitive['image_tiles'] = self.image_tiles
+        return primitive
 
 
 class MapSchemeLine(object):
-    def __init__(self, name, text_id, line_color, line_width, labels_color, labels_bg_color, stations, segments):
+    __slots__ = ('name', 'text_id', 'line_color', 'line_width', 'labels_color', 'labels_bg_color', 'stations',
+                 'segments', 'bbox')
+
+    def __init__(self, name, text_id, line_color, line_width, labels_color, labels_bg_color, stations, segments,
+                 bbox=None):
         self.name = name
         self.text_id = text_id
         self.line_color = line_color
@@ -85,9 +173,24 @@ class MapSchemeLine(object):
         self.labels_bg_color = labels_bg_color
         self.stations = stations
         self.segments = segments
+        self.bbox = bbox
+
+    def to_primitive(self):
+        return {
+            'name': self.name,
+            'text_id': self.text_id,
+            'line_color': self.line_color,
+            'line_width': self.line_width,
+            'labels_color': self.labels_color,
+            'labels_bg_color': self.labels_bg_color,
+            'stations': self.stations,
+            'segments': self.segments
+        }
 
 
 class MapSchemeStation(object):
+    __slots__ = ('uid', 'name', 'text_id', 'coord', 'rect', 'is_working')
+
     def __init__(self):
         self.uid = 0
         self.name = None
@@ -95,3 +198,13 @@ class MapSchemeStation(object):
         self.coord = None
         self.rect = None
         self.is_working = None
+
+    def to_primitive(self):
+        return {
+            'uid': self.uid,
+            'name': self.name,
+            'text_id': self.text_id,
+            'coord': self.coord,
+            'rect': self.rect,
+            'is_working': self.is_working
+        }
@@ -1,8 +1,10 @@
 import codecs
-import shutil
+import filecmp
 import os
 import zipfile
 
+from pmetro.zip_writer import write_zip
+
 
 def unzip_file(source_filename, destination_path):
     with zipfile.ZipFile(source_filename) as zf:
@@ -10,15 +12,30 @@ def unzip_file(source_filename, destination_path):
         zf.close()
 
 
-def zip_folder(source_path, destination_filename):
-    tmp_file_path = os.path.join(os.path.dirname(source_path), 'archive')
+def zip_folder(source_path, destination_filename, member_names=None):
+    tmp_file_path = os.path.join(os.path.dirname(source_path), 'archive.zip')
+
+    if member_names is None:
+        member_names = list_folder_files(source_path)
+    write_zip(tmp_file_path, [(m, os.path.join(source_path, m)) for m in member_names])
 
-    shutil.make_archive(tmp_file_path, 'zip', source_path)
+    if os.path.isfile(destination_filename) and filecmp.cmp(tmp_file_path, destination_filename, shallow=False):
+        os.remove(tmp_file_path)
+        return False
 
     if os.path.isfile(destination_filename):
         os.remove(destination_filename)
 
-    os.rename(tmp_file_path + '.zip', destination_filename)
+    os.rename(tmp_file_path, destination_filename)
+    return True
+
+
+def list_folder_files(path):
+    file_list = []
+    for root, dirs, files in os.walk(path):
+        for file_name in files:
+            file_list.append(os.path.relpath(os.path.join(root, file_name), path).replace('\\', '/'))
+    return sorted(file_list)
 
 
 def find_file_by_extension(path, file_ext):
@@ -0,0 +1,167 @@
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+from pmetro.entities import MapContainer, MapMetadata, MapImage, MapTransport, MapTransportLine, MapScheme, \
+    MapSchemeLine, MapSchemeStation
+from pmetro.pmz_texts import TextTable
+
+MODEL_CACHE_VERSION = 3
+MODEL_CACHE_INDEX = 'models.json'
+MODEL_FILE = 'model.json.gz'
+RESOURCES_FOLDER = 'res'
+
+
+class MapModelCache(object):
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.index_path = os.path.join(cache_path, MODEL_CACHE_INDEX)
+        if not os.path.isdir(cache_path):
+            os.mkdir(cache_path)
+        self.index = self.__load_index()
+
+    def get_map_digest(self, file_name):
+        return self.index.get(file_name)
+
+    def contains(self, digest):
+        return digest is not None and os.path.isfile(os.path.join(self.cache_path, digest, MODEL_FILE))
+
+    def load(self, digest):
+        with gzip.open(os.path.join(self.cache_path, digest, MODEL_FILE), 'rb') as f:
+            data = json.loads(codecs.decode(f.read(), 'utf-8'))
+        if data.get('version') != MODEL_CACHE_VERSION:
+            return None
+        return decode_container(data['model'])
+
+    def restore_resources(self, digest, dst_path):
+        src_res_path = os.path.join(self.cache_path, digest, RESOURCES_FOLDER)
+        dst_res_path = os.path.join(dst_path, RESOURCES_FOLDER)
+        if os.path.isdir(dst_res_path):
+            shutil.rmtree(dst_res_path)
+        shutil.copytree(src_res_path, dst_res_path)
+
+    def store(self, digest, container, dst_path):
+        entry_path = os.path.join(self.cache_path, digest)
+        tmp_path = entry_path + '.tmp'
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.mkdir(tmp_path)
+
+        shutil.copytree(os.path.join(dst_path, RESOURCES_FOLDER), os.path.join(tmp_path, RESOURCES_FOLDER))
+        data = {'version': MODEL_CACHE_VERSION, 'model': encode_container(container)}
+        with gzip.open(os.path.join(tmp_path, MODEL_FILE), 'wb') as f:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+        if os.path.isdir(entry_path):
+            shutil.rmtree(entry_path)
+        os.rename(tmp_path, entry_path)
+
+        self.__register(container.meta.file, digest)
+
+    def remove_obsolete(self):
+        used = set(self.index.values())
+        for name in os.listdir(self.cache_path):
+            if name != MODEL_CACHE_INDEX and name not in used:
+                shutil.rmtree(os.path.join(self.cache_path, name), ignore_errors=True)
+
+    def __register(self, file_name, digest):
+        self.index[file_name] = digest
+        tmp_path = self.index_path + '.tmp'
+        with codecs.open(tmp_path, 'w', 'utf-8') as f:
+            json.dump({'version': MODEL_CACHE_VERSION, 'maps': self.index}, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def __load_index(self):
+        if not os.path.isfile(self.index_path):
+            return dict()
+        with codecs.open(self.index_path, 'r', 'utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MODEL_CACHE_VERSION:
+            return dict()
+        return data['maps']
+
+
+def get_source_digest(src_path, city_id, file_name, timestamp, svg_tile_size=None):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([MODEL_CACHE_VERSION, city_id, file_name, timestamp, svg_tile_size]).encode('utf-8'))
+    for root, dirs, files in os.walk(src_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, src_path).replace('\\', '/').encode('utf-8'))
+            digest.update(b'\0')
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b''):
+                    digest.update(chunk)
+            digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def encode_container(container):
+    return {
+        'meta': container.meta.to_primitive(),
+        'images': [image.to_primitive() for image in container.images],
+        'transports': [__encode_transport(transport) for transport in container.transports],
+        'schemes': [__encode_scheme(scheme) for scheme in container.schemes],
+        'texts': [{'language_code': table.language_code, 'texts': table.texts} for table in container.texts]
+    }
+
+
+def decode_container(data):
+    container = MapContainer()
+    container.meta = __restore(MapMetadata, data['meta'])
+    container.images = [__restore(MapImage, image) for image in data['images']]
+    container.transports = [__decode_transport(transport) for transport in data['transports']]
+    container.schemes = [__decode_scheme(scheme) for scheme in data['schemes']]
+    container.texts = [TextTable([tuple(text) for text in table['texts']], table['language_code'])
+                       for table in data['texts']]
+    return container
+
+
+def __encode_transport(transport):
+    data = transport.to_primitive()
+    data['lines'] = [line.to_primitive() for line in transport.lines]
+    return data
+
+
+def __decode_transport(data):
+    transport = __restore(MapTransport, data)
+    transport.transfers = [tuple(transfer) for transfer in transport.transfers]
+    transport.lines = [__restore(MapTransportLine, line) for line in transport.lines]
+    for line in transport.lines:
+        line.stations = [tuple(station) for station in line.stations]
+        line.segments = [tuple(segment) for segment in line.segments]
+    return transport
+
+
+def __encode_scheme(scheme):
+    data = scheme.to_primitive()
+    data['image_tiles'] = scheme.image_tiles
+    data['lines'] = []
+    for line in scheme.lines:
+        line_data = line.to_primitive()
+        line_data['stations'] = [station.to_primitive() for station in line.stations]
+        line_data['bbox'] = line.bbox
+        data['lines'].append(line_data)
+    return data
+
+
+def __decode_scheme(data):
+    scheme = __restore(MapScheme, data)
+    scheme.transfers = [tuple(transfer) for transfer in scheme.transfers]
+    scheme.lines = [__restore(MapSchemeLine, line) for line in scheme.lines]
+    for line in scheme.lines:
+        line.stations = [__restore(MapSchemeStation, station) for station in line.stations]
+        line.segments = [tuple(segment) for segment in line.segments]
+        line.bbox = tuple(line.bbox) if line.bbox is not None else None
+    return scheme
+
+
+def __restore(cls, data):
+    obj = cls.__new__(cls)
+    for name in cls.__slots__:
+        setattr(obj, name, data[name])
+    return obj
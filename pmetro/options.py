@@ -0,0 +1,20 @@
+from pmetro.serialization import TEXT_FORMAT_JSON, OUTPUT_PROFILE_PRETTY
+
+
+class ConvertOptions(object):
+    def __init__(self, svg_tile_size=None, text_format=TEXT_FORMAT_JSON, profile=OUTPUT_PROFILE_PRETTY,
+                 size_report=False, binary_model=False, coords_codec=False, model_cache_path=None,
+                 scheme_chunks=False, sqlite_package=False, delta_depth=0,
+                 text_dictionary_path=None, lite_packages=False):
+        self.svg_tile_size = svg_tile_size
+        self.text_format = text_format
+        self.profile = profile
+        self.size_report = size_report
+        self.binary_model = binary_model
+        self.coords_codec = coords_codec
+        self.model_cache_path = model_cache_path
+        self.scheme_chunks = scheme_chunks
+        self.sqlite_package = sqlite_package
+        self.delta_depth = delta_depth
+        self.text_dictionary_path = text_dictionary_path
+        self.lite_packages = lite_packages
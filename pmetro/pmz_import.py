@@ -21,19 +21,79 @@ from pmetro.pmz_texts import StationIndex, TextIndexTable, load_texts, TEXT_AS_C
 from pmetro.entities import MapMetadata, MapContainer, MapTransport, MapTransportLine
 from pmetro.pmz_transports import parse_line_delays
 from pmetro.file_utils import get_file_ext, get_file_name_without_ext, find_appropriate_file
-from pmetro.serialization import store_model
+from pmetro.model_cache import MapModelCache, get_source_digest
+from pmetro.options import ConvertOptions
+from pmetro.serialization import store_model, JsonSizeReport
+from pmetro.sqlite_package import write_sqlite_package
 from pmetro.vec2svg import convert_vec_to_svg
 
 
-def convert_map(city_id, file_name, timestamp, src_path, dst_path, logger, geoname_provider):
+def convert_map(city_id, file_name, timestamp, src_path, dst_path, logger, geoname_provider, options=None,
+                package_path=None):
+    if options is None:
+        options = ConvertOptions()
     logger.message("Begin processing %s" % src_path)
-    importer = PmzImporter(logger, geoname_provider)
-    container = importer.import_pmz(src_path, city_id, file_name, timestamp)
-    __convert_resources(container, src_path, dst_path, logger)
-    store_model(container, dst_path)
+
+    model_cache = MapModelCache(options.model_cache_path) if options.model_cache_path is not None else None
+    digest = None
+    container = None
+    if model_cache is not None:
+        digest = get_source_digest(src_path, city_id, file_name, timestamp, options.svg_tile_size)
+        if model_cache.contains(digest):
+            container = model_cache.load(digest)
+
+    if container is not None:
+        logger.info('Map %s loaded from model cache %s' % (file_name, digest))
+        model_cache.restore_resources(digest, dst_path)
+    else:
+        importer = PmzImporter(logger, geoname_provider)
+        container = importer.import_pmz(src_path, city_id, file_name, timestamp)
+        __convert_resources(container, src_path, dst_path, logger, options)
+        if model_cache is not None:
+            model_cache.store(digest, container, dst_path)
+
+    __store_model(container, file_name, dst_path, logger, options)
+    if package_path is not None:
+        write_sqlite_package(container, dst_path, package_path)
+    return container
+
+
+def reserialize_map(file_name, model_cache_path, dst_path, logger, options=None, package_path=None):
+    if options is None:
+        options = ConvertOptions()
+    model_cache = MapModelCache(model_cache_path)
+    digest = model_cache.get_map_digest(file_name)
+    if not model_cache.contains(digest):
+        raise FileNotFoundError('Map %s not found in model cache %s' % (file_name, model_cache_path))
+
+    container = model_cache.load(digest)
+    if container is None:
+        raise ValueError('Map %s has cached model of unsupported version' % file_name)
+
+    logger.message("Begin re-serializing %s" % file_name)
+    model_cache.restore_resources(digest, dst_path)
+    __store_model(container, file_name, dst_path, logger, options)
+    if package_path is not None:
+        write_sqlite_package(container, dst_path, package_path)
+    return container
+
+
+def __store_model(container, file_name, dst_path, logger, options):
+    size_report = JsonSizeReport() if options.size_report else None
+    store_model(container, dst_path, text_format=options.text_format, profile=options.profile,
+                size_report=size_report, binary_model=options.binary_model, coords_codec=options.coords_codec,
+                scheme_chunks=options.scheme_chunks)
+
+    if size_report is not None:
+        logger.info('Map %s JSON size: %s bytes as %s, %s bytes as pretty, saved %s bytes' % (
+            file_name,
+            size_report.get_size(),
+            options.profile,
+            size_report.get_pretty_size(),
+            size_report.get_pretty_size() - size_report.get_size()))
 
 
-def __convert_resources(map_container, src_path, dst_path, logger):
+def __convert_resources(map_container, src_path, dst_path, logger, options):
     res_path = os.path.join(dst_path, 'res')
     if not os.path.isdir(res_path):
         os.mkdir(res_path)
@@ -43,17 +103,23 @@ def __convert_resources(map_container, src_path, dst_path, logger):
         os.mkdir(schemes_path)
     for scheme in map_container.schemes:
         converted_images = []
+        image_tiles = dict()
         for scheme_image in scheme.images:
             if scheme_image is None:
                 continue
 
-            converted_file_path = __convert_static_file(src_path, scheme_image, schemes_path, logger)
+            converted_file_path, meta = __convert_static_file(src_path, scheme_image, schemes_path, logger, options)
             if converted_file_path is None:
                 continue
 
-            converted_images.append(os.path.relpath(converted_file_path, dst_path).replace('\\', '/'))
+            converted_image = os.path.relpath(converted_file_path, dst_path).replace('\\', '/')
+            converted_images.append(converted_image)
+            if isinstance(meta, dict) and 'tiles' in meta:
+                tiles_file_path = os.path.join(os.path.dirname(converted_file_path), meta['tiles'])
+                image_tiles[converted_image] = os.path.relpath(tiles_file_path, dst_path).replace('\\', '/')
 
         scheme.images = converted_images
+        scheme.image_tiles = image_tiles
 
     images_path = os.path.join(res_path, 'stations')
     if not os.path.isdir(images_path):
@@ -65,7 +131,7 @@ def __convert_resources(map_container, src_path, dst_path, logger):
         if image.image is None:
             continue
 
-        converted_file_path = __convert_static_file(src_path, image.image, images_path, logger)
+        converted_file_path, meta = __convert_static_file(src_path, image.image, images_path, logger, options)
         if converted_file_path is None:
             continue
 
@@ -75,9 +141,9 @@ def __convert_resources(map_container, src_path, dst_path, logger):
     map_container.images = converted_images
 
 
-def __convert_static_file(src_path, src_name, dst_path, logger):
+def __convert_static_file(src_path, src_name, dst_path, logger, options):
     __FILE_CONVERTERS = {
-        'vec': (convert_vec_to_svg, 'svg'),
+        'vec': (lambda src, dst, l: convert_vec_to_svg(src, dst, l, tile_size=options.svg_tile_size), 'svg'),
         'bmp': (lambda src, dst, l: Image.open(src).save(dst), 'png'),
         'gif': (lambda src, dst, l: Image.open(src).save(dst), 'png'),
         'png': (lambda src, dst, l: shutil.copy(src, dst), 'png')
@@ -87,20 +153,21 @@ def __convert_static_file(src_path, src_name, dst_path, logger):
 
     if not os.path.isfile(src_file_path):
         logger.error('Not found image file %s' % src_file_path)
-        return None
+        return None, None
 
     src_file_ext = get_file_ext(src_file_path)
     if src_file_ext in __FILE_CONVERTERS:
         new_ext = __FILE_CONVERTERS[src_file_ext][1]
         dst_file_path = os.path.join(dst_path, get_file_name_without_ext(src_name.lower()) + '.' + new_ext)
         logger.debug('Convert %s' % src_file_path)
-        __FILE_CONVERTERS[src_file_ext][0](src_file_path, dst_file_path, logger)
+        meta = __FILE_CONVERTERS[src_file_ext][0](src_file_path, dst_file_path, logger)
     else:
         logger.warning('No converters found for file %s, copy file' % src_file_path)
         dst_file_path = os.path.join(dst_path, src_name.lower())
         shutil.copy(src_file_path, dst_file_path)
+        meta = None
 
-    return dst_file_path
+    return dst_file_path, meta
 
 
 class PmzImporter(object):
@@ -247,7 +314,7 @@ class PmzTransportImporter(object):
 
         lines = []
         for section_name in sorted(sections):
-            line_name = get_ini_attr(ini, section_name, 'Name')
+            line_name = self.__station_index.intern_name(get_ini_attr(ini, section_name, 'Name'))
             line_display_name = get_ini_attr(ini, section_name, 'Alias', line_name)
             line_map = get_ini_attr(ini, section_name, 'LineMap')
             stations_text = get_ini_attr(ini, section_name, 'Stations')
@@ -311,6 +378,8 @@ class PmzTransportImporter(object):
 
             if not quoted:
 
+                name = self.__station_index.intern_name(name)
+
                 station_uid = self.__station_index.register_station(line_name, name)
 
                 if display_name in station_aliases:
@@ -499,16 +568,38 @@ class PmzSchemeImporter(object):
             additional_nodes)
 
         return MapSchemeLine(
-            line_name,
+            self.__station_index.intern_name(line_name),
             text_id,
             line_color,
             line_width,
             labels_color,
             labels_bg_color,
             stations,
-            segments
+            segments,
+            self.__get_line_bounding_box(stations, segments)
         )
 
+    @staticmethod
+    def __get_line_bounding_box(stations, segments):
+        points = []
+        for station in stations:
+            if station.coord is not None:
+                points.append(station.coord)
+            if station.rect is not None:
+                x, y, width, height = station.rect
+                points.append((x, y))
+                points.append((x + width, y + height))
+
+        for from_uid, to_uid, segment_points, is_working in segments:
+            if segment_points is not None:
+                points.extend(segment_points)
+
+        if not points:
+            return None
+
+        return (min(x for x, y in points), min(y for x, y in points),
+                max(x for x, y in points), max(y for x, y in points))
+
     def __get_line_color(self, name, proposed_color):
         if proposed_color:
             self.__line_colors[name] = proposed_color
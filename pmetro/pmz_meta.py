@@ -14,7 +14,7 @@ def load_metadata(map_container, path, text_index_table):
 
     delays = as_list(get_ini_attr(metadata, 'Options', 'DelayNames', 'Day,Night'))
     map_container.meta.delays = __parse_delays(delays, text_index_table)
-    map_container.meta.transport_types = list(set([trp.type_name for trp in map_container.transports]))
+    map_container.meta.transport_types = sorted(set([trp.type_name for trp in map_container.transports]))
     map_container.meta.transports = list([__get_transport_meta(trp) for trp in map_container.transports])
 
     child_schemes = __get_child_schemes(map_container)
@@ -1,5 +1,9 @@
 import transliterate
 
+from pmetro.transliteration import TransliterationEngine
+
+TRANSLITERATION = TransliterationEngine()
+
 __WELL_KNOWN_WORDS = {
     'Метро': 'Metro',
     'Трамвай': 'Tram',
@@ -35,17 +39,19 @@ def translate_text_table_to_en(text_table):
             "Language code " + language_code + " not found in supported transliteration tables " + ",".join(
                 transliterate.get_available_language_codes()))
 
-    return TextTable(
+    translated_table = TextTable(
         [(text_id, translate_text_to_en(text, text_table.language_code), text_type) for text_id, text, text_type in
          text_table.texts],
         'en'
     )
+    TRANSLITERATION.flush()
+    return translated_table
 
 
 def translate_text_to_en(text, language_code):
     if text in __WELL_KNOWN_WORDS:
         return __WELL_KNOWN_WORDS[text]
-    return transliterate.translit(text, language_code, reversed=True)
+    return TRANSLITERATION.translit(text, language_code)
 
 
 class TextTable(object):
@@ -104,8 +110,14 @@ class StationIndex(object):
     def __init__(self):
         self.registered_stations = dict()
         self.pending_stations = dict()
+        self.names = dict()
         self.id_counter = 0
 
+    def intern_name(self, name):
+        if name is None:
+            return None
+        return self.names.setdefault(name, name)
+
     def register_station(self, line_name, station_name):
         key = (line_name.lower(), station_name.lower())
         if key in self.registered_stations:
@@ -3,51 +3,167 @@ from json import JSONEncoder
 import json
 import os
 
+from pmetro.binary_serialization import encode_text_table, encode_text_types, write_binary_file, encode_scheme, \
+    encode_transport
+from pmetro.coords_codec import encode_polylines_base64, COORDS_SCALE
+
+TEXT_FORMAT_JSON = 'json'
+TEXT_FORMAT_BINARY = 'binary'
+
+OUTPUT_PROFILE_PRETTY = 'pretty'
+OUTPUT_PROFILE_COMPACT = 'compact'
+
+__JSON_PROFILES = {
+    OUTPUT_PROFILE_PRETTY: dict(indent=4, sort_keys=True),
+    OUTPUT_PROFILE_COMPACT: dict(separators=(',', ':'), sort_keys=True)
+}
+
 
 class MapEncoder(JSONEncoder):
     def default(self, o):
+        to_primitive = getattr(o, 'to_primitive', None)
+        if to_primitive is not None:
+            return to_primitive()
         return o.__dict__
 
 
-def as_json(obj):
-    return json.dumps(obj, ensure_ascii=False, cls=MapEncoder, indent=4, sort_keys=True)
+class JsonSizeReport(object):
+    def __init__(self):
+        self.files = []
+
+    def add(self, obj, path):
+        pretty_size = get_json_size(obj, OUTPUT_PROFILE_PRETTY)
+        self.files.append((path, os.path.getsize(path), pretty_size))
+
+    def get_size(self):
+        return sum(size for path, size, pretty_size in self.files)
+
+    def get_pretty_size(self):
+        return sum(pretty_size for path, size, pretty_size in self.files)
 
 
-def write_as_json_file(obj, path):
+def as_json(obj, profile=OUTPUT_PROFILE_PRETTY):
+    return json.dumps(obj, ensure_ascii=False, cls=MapEncoder, **get_json_profile(profile))
+
+
+def get_json_profile(profile):
+    if profile not in __JSON_PROFILES:
+        raise ValueError('Unknown output profile %s' % profile)
+    return __JSON_PROFILES[profile]
+
+
+def get_json_size(obj, profile=OUTPUT_PROFILE_PRETTY):
+    encoder = MapEncoder(ensure_ascii=False, **get_json_profile(profile))
+    return sum(len(chunk.encode('utf-8')) for chunk in encoder.iterencode(obj))
+
+
+def write_as_json_file(obj, path, profile=OUTPUT_PROFILE_PRETTY, size_report=None):
     with codecs.open(path, 'w', encoding='utf-8') as f:
-        f.write(as_json(obj))
+        json.dump(obj, f, ensure_ascii=False, cls=MapEncoder, **get_json_profile(profile))
+
+    if size_report is not None:
+        size_report.add(obj, path)
 
 
-def store_model(map_container, dst_path):
-    write_as_json_file(map_container.meta, os.path.join(dst_path, 'index.json'))
-    write_as_json_file(map_container.images, os.path.join(dst_path, 'images.json'))
+def store_model(map_container, dst_path, text_format=TEXT_FORMAT_JSON, profile=OUTPUT_PROFILE_PRETTY,
+                size_report=None, binary_model=False, coords_codec=False, scheme_chunks=False):
+    write_as_json_file(map_container.meta, os.path.join(dst_path, 'index.json'), profile, size_report)
+    write_as_json_file(map_container.images, os.path.join(dst_path, 'images.json'), profile, size_report)
 
     schemes_path = os.path.join(dst_path, 'texts')
     if not os.path.isdir(schemes_path):
         os.mkdir(schemes_path)
 
-    for text_table in map_container.texts:
-        write_as_json_file(
-            dict((text_id, text) for (text_id, text, text_type) in text_table.texts),
-            os.path.join(dst_path, 'texts/{0}.json'.format(text_table.language_code)))
-
-    write_as_json_file(
-        dict((text_id, text_type) for (text_id, text, text_type) in map_container.texts[0].texts),
-        os.path.join(dst_path, 'texts/meta.json'))
+    if text_format == TEXT_FORMAT_BINARY:
+        __store_binary_texts(map_container, dst_path)
+    elif text_format == TEXT_FORMAT_JSON:
+        __store_json_texts(map_container, dst_path, profile, size_report)
+    else:
+        raise ValueError('Unknown text format %s' % text_format)
 
     transports_path = os.path.join(dst_path, 'transports')
     if not os.path.isdir(transports_path):
         os.mkdir(transports_path)
 
     for transport in map_container.transports:
-        write_as_json_file(transport, os.path.join(transports_path, transport.name + '.json'))
+        write_as_json_file(transport, os.path.join(transports_path, transport.name + '.json'), profile, size_report)
+        if binary_model:
+            write_binary_file(encode_transport(transport), os.path.join(transports_path, transport.name + '.bin'))
 
     schemes_path = os.path.join(dst_path, 'schemes')
     if not os.path.isdir(schemes_path):
         os.mkdir(schemes_path)
 
     for scheme in map_container.schemes:
-        write_as_json_file(scheme, os.path.join(schemes_path, scheme.name + '.json'))
+        json_scheme = __with_encoded_points(scheme) if coords_codec else scheme
+        write_as_json_file(json_scheme, os.path.join(schemes_path, scheme.name + '.json'), profile, size_report)
+        if binary_model:
+            write_binary_file(encode_scheme(scheme, coords_codec), os.path.join(schemes_path, scheme.name + '.bin'))
+        if scheme_chunks:
+            __store_scheme_chunks(scheme, os.path.join(schemes_path, scheme.name), profile, size_report, coords_codec)
+
+
+def __with_encoded_points(scheme):
+    encoded_scheme = scheme.to_primitive()
+    encoded_scheme['coords_scale'] = COORDS_SCALE
+    encoded_scheme['lines'] = [__with_encoded_line_points(line) for line in scheme.lines]
+    return encoded_scheme
+
+
+def __with_encoded_line_points(line):
+    encoded_line = line.to_primitive()
+    encoded_line['segments'] = [(from_uid, to_uid, None, is_working)
+                                for from_uid, to_uid, points, is_working in line.segments]
+    encoded_line['points'] = encode_polylines_base64([segment[2] for segment in line.segments])
+    return encoded_line
+
+
+def __store_scheme_chunks(scheme, chunks_path, profile, size_report, coords_codec):
+    if not os.path.isdir(chunks_path):
+        os.mkdir(chunks_path)
+
+    header = scheme.to_primitive()
+    header['lines'] = []
+    for line_number, line in enumerate(scheme.lines):
+        line_file = 'line.{0}.json'.format(line_number)
+        header['lines'].append({
+            'name': line.name,
+            'text_id': line.text_id,
+            'line_color': line.line_color,
+            'bbox': line.bbox,
+            'file': line_file
+        })
+        json_line = __with_encoded_line_points(line) if coords_codec else line
+        write_as_json_file(json_line, os.path.join(chunks_path, line_file), profile, size_report)
+
+    header['transfers'] = 'transfers.json'
+    if coords_codec:
+        header['coords_scale'] = COORDS_SCALE
+    write_as_json_file(scheme.transfers, os.path.join(chunks_path, 'transfers.json'), profile, size_report)
+    write_as_json_file(header, os.path.join(chunks_path, 'index.json'), profile, size_report)
+
+
+def __store_json_texts(map_container, dst_path, profile, size_report):
+    for text_table in map_container.texts:
+        write_as_json_file(
+            dict((text_id, text) for (text_id, text, text_type) in text_table.texts),
+            os.path.join(dst_path, 'texts/{0}.json'.format(text_table.language_code)),
+            profile,
+            size_report)
+
+    write_as_json_file(
+        dict((text_id, text_type) for (text_id, text, text_type) in map_container.texts[0].texts),
+        os.path.join(dst_path, 'texts/meta.json'),
+        profile,
+        size_report)
 
 
+def __store_binary_texts(map_container, dst_path):
+    for text_table in map_container.texts:
+        write_binary_file(
+            encode_text_table(text_table.texts),
+            os.path.join(dst_path, 'texts/{0}.bin'.format(text_table.language_code)))
 
+    write_binary_file(
+        encode_text_types(map_container.texts[0].texts),
+        os.path.join(dst_path, 'texts/meta.bin'))
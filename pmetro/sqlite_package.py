@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+
+SQLITE_PACKAGE_VERSION = 2
+
+__CREATE_TABLE_QUERIES = [
+    'CREATE TABLE meta (key text PRIMARY KEY, value text)',
+    'CREATE TABLE text (locale text, text_id int, text text, PRIMARY KEY (locale, text_id))',
+    'CREATE TABLE text_type (text_id int PRIMARY KEY, text_type int)',
+    'CREATE TABLE image (caption text, line text, station text, image text)',
+    'CREATE TABLE transport (name text PRIMARY KEY, type_name text)',
+    'CREATE TABLE transport_line (' +
+    '   line_id int PRIMARY KEY, transport text, name text, text_id int, scheme text, delays text)',
+    'CREATE TABLE transport_station (line_id int, uid int, name text, text_id int)',
+    'CREATE TABLE transport_segment (line_id int, from_uid int, to_uid int, delay int)',
+    'CREATE TABLE transport_transfer (transport text, from_uid int, to_uid int, delay int, is_visible int)',
+    'CREATE TABLE scheme (name text PRIMARY KEY, properties text)',
+    'CREATE TABLE line (' +
+    '   line_id int PRIMARY KEY, scheme text, name text, text_id int, line_color text, line_width int, ' +
+    '   labels_color text, labels_bg_color text, bbox text)',
+    'CREATE TABLE station (line_id int, uid int, name text, text_id int, coord text, rect text, is_working int)',
+    'CREATE TABLE segment (line_id int, from_uid int, to_uid int, points text, is_working int)',
+    'CREATE TABLE transfer (scheme text, from_uid int, to_uid int, from_coord text, to_coord text)',
+    'CREATE TABLE resource (name text PRIMARY KEY, data blob)'
+]
+
+__CREATE_INDEX_QUERIES = [
+    'CREATE INDEX IX_transport_line_name ON transport_line (transport, name)',
+    'CREATE INDEX IX_transport_station_uid ON transport_station (uid)',
+    'CREATE INDEX IX_transport_station_line ON transport_station (line_id)',
+    'CREATE INDEX IX_transport_segment_line ON transport_segment (line_id)',
+    'CREATE INDEX IX_transport_segment_from ON transport_segment (from_uid)',
+    'CREATE INDEX IX_line_name ON line (scheme, name)',
+    'CREATE INDEX IX_station_uid ON station (uid)',
+    'CREATE INDEX IX_station_line ON station (line_id)',
+    'CREATE INDEX IX_segment_line ON segment (line_id)',
+    'CREATE INDEX IX_segment_from ON segment (from_uid)',
+    'CREATE INDEX IX_transfer_from ON transfer (from_uid)'
+]
+
+
+def write_sqlite_package(map_container, dst_path, package_path):
+    tmp_path = package_path + '.tmp'
+    if os.path.isfile(tmp_path):
+        os.remove(tmp_path)
+
+    cnn = sqlite3.connect(tmp_path)
+    try:
+        c = cnn.cursor()
+        for query in __CREATE_TABLE_QUERIES:
+            c.execute(query)
+
+        __insert_meta(c, map_container)
+        __insert_texts(c, map_container)
+        __insert_transports(c, map_container)
+        __insert_schemes(c, map_container)
+        __insert_resources(c, dst_path)
+
+        for query in __CREATE_INDEX_QUERIES:
+            c.execute(query)
+        cnn.commit()
+    finally:
+        cnn.close()
+
+    os.replace(tmp_path, package_path)
+
+
+def __insert_meta(c, map_container):
+    c.execute('INSERT INTO meta VALUES (?,?)', ('package_version', __as_json(SQLITE_PACKAGE_VERSION)))
+    c.executemany('INSERT INTO meta VALUES (?,?)',
+                  [(key, __as_json(value)) for key, value in sorted(map_container.meta.to_primitive().items())])
+    c.executemany('INSERT INTO image VALUES (?,?,?,?)',
+                  [(image.caption, image.line, image.station, image.image) for image in map_container.images])
+
+
+def __insert_texts(c, map_container):
+    for text_table in map_container.texts:
+        c.executemany('INSERT INTO text VALUES (?,?,?)',
+                      [(text_table.language_code, text_id, text) for text_id, text, text_type in text_table.texts])
+
+    c.executemany('INSERT INTO text_type VALUES (?,?)',
+                  [(text_id, text_type) for text_id, text, text_type in map_container.texts[0].texts])
+
+
+def __insert_transports(c, map_container):
+    line_id = 0
+    for transport in map_container.transports:
+        c.execute('INSERT INTO transport VALUES (?,?)', (transport.name, transport.type_name))
+        c.executemany('INSERT INTO transport_transfer VALUES (?,?,?,?,?)',
+                      [(transport.name, from_uid, to_uid, delay, is_visible)
+                       for from_uid, to_uid, delay, is_visible in transport.transfers])
+
+        for line in transport.lines:
+            c.execute('INSERT INTO transport_line VALUES (?,?,?,?,?,?)',
+                      (line_id, transport.name, line.name, line.text_id, line.scheme, __as_json(line.delays)))
+            c.executemany('INSERT INTO transport_station VALUES (?,?,?,?)',
+                          [(line_id, uid, name, text_id) for uid, name, text_id in line.stations])
+            c.executemany('INSERT INTO transport_segment VALUES (?,?,?,?)',
+                          [(line_id, from_uid, to_uid, delay) for from_uid, to_uid, delay in line.segments])
+            line_id += 1
+
+
+def __insert_schemes(c, map_container):
+    line_id = 0
+    for scheme in map_container.schemes:
+        properties = scheme.to_primitive()
+        del properties['lines']
+        del properties['transfers']
+        c.execute('INSERT INTO scheme VALUES (?,?)', (scheme.name, __as_json(properties)))
+        c.executemany('INSERT INTO transfer VALUES (?,?,?,?,?)',
+                      [(scheme.name, from_uid, to_uid, __as_json(from_coord), __as_json(to_coord))
+                       for from_uid, to_uid, from_coord, to_coord in scheme.transfers])
+
+        for line in scheme.lines:
+            c.execute('INSERT INTO line VALUES (?,?,?,?,?,?,?,?,?)',
+                      (line_id, scheme.name, line.name, line.text_id, line.line_color, line.line_width,
+                       line.labels_color, line.labels_bg_color, __as_json(line.bbox)))
+            c.executemany('INSERT INTO station VALUES (?,?,?,?,?,?,?)',
+                          [(line_id, station.uid, station.name, station.text_id, __as_json(station.coord),
+                            __as_json(station.rect), station.is_working) for station in line.stations])
+            c.executemany('INSERT INTO segment VALUES (?,?,?,?,?)',
+                          [(line_id, from_uid, to_uid, __as_json(points), is_working)
+                           for from_uid, to_uid, points, is_working in line.segments])
+            line_id += 1
+
+
+def __insert_resources(c, dst_path):
+    res_path = os.path.join(dst_path, 'res')
+    for root, dirs, files in os.walk(res_path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            with open(file_path, 'rb') as f:
+                c.execute('INSERT INTO resource VALUES (?,?)',
+                          (os.path.relpath(file_path, dst_path).replace('\\', '/'), sqlite3.Binary(f.read())))
+
+
+def __as_json(value):
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
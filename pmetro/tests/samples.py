@@ -0,0 +1,77 @@
+from pmetro.entities import MapContainer, MapMetadata, MapImage, MapTransport, MapTransportLine, MapScheme, \
+    MapSchemeLine, MapSchemeStation
+from pmetro.pmz_texts import TextTable
+
+
+def create_station(uid, name, text_id, coord, rect=None, is_working=True):
+    station = MapSchemeStation()
+    station.uid = uid
+    station.name = name
+    station.text_id = text_id
+    station.coord = coord
+    station.rect = rect
+    station.is_working = is_working
+    return station
+
+
+def create_transport():
+    line = MapTransportLine(
+        'Line 1',
+        1,
+        'metro',
+        [(0, 'Station A', 2), (1, 'Station B', 3), (2, 'Station C', None)],
+        [(0, 1, 120), (1, 0, 120), (1, 2, -1), (2, 1, None)],
+        {'day': 90, 'night': None})
+    return MapTransport('metro', 'Метро', [line], [(0, 2, 180, True), (1, 2, -1, False), (2, 0, None, True)])
+
+
+def create_scheme():
+    stations = [
+        create_station(0, 'Station A', 2, (100, 100), (90, 80, 40, 12)),
+        create_station(1, 'Station B', 3, (200, 120)),
+        create_station(2, 'Station C', None, None, is_working=False)
+    ]
+    segments = [
+        (0, 1, [(100, 100), (200, 120)], True),
+        (1, 2, [(200.0, 120.0), (250.5, 130.25), (300.75, 140.0)], False),
+        (2, 1, [], True)
+    ]
+    scheme = MapScheme()
+    scheme.name = 'metro'
+    scheme.name_text_id = 4
+    scheme.type_text_id = 5
+    scheme.type_name = 'ROOT'
+    scheme.width = 640
+    scheme.height = 480
+    scheme.images = ['res/schemes/metro.svg']
+    scheme.transports = ['metro']
+    scheme.default_transports = ['metro']
+    scheme.lines = [MapSchemeLine('Line 1', 1, 'ff0000', 9, None, None, stations, segments, (90, 80, 300.75, 140.0))]
+    scheme.transfers = [(0, 2, (100, 100), None), (1, 2, None, None)]
+    return scheme
+
+
+def create_map_container():
+    container = MapContainer()
+    container.meta = MapMetadata(524901, 'Moscow.zip', 1400000000, 55.75, 37.61, 6, 7)
+    container.meta.transport_types = ['Метро']
+    container.meta.transports = ['metro']
+    container.meta.schemes = ['metro']
+    container.meta.locales = ['en', 'ru']
+    container.meta.default_locale = 'ru'
+
+    image = MapImage()
+    image.caption = 'Station A'
+    image.line = 'Line 1'
+    image.station = 'Station A'
+    image.image = 'res/stations/a.png'
+    container.images = [image]
+
+    container.transports = [create_transport()]
+    container.schemes = [create_scheme()]
+    texts = ['', 'Line 1', 'Station A', 'Station B', 'Metro', 'ROOT', 'Description', 'Comments']
+    container.texts = [
+        TextTable([(text_id, text, 1 if text_id > 5 else 0) for text_id, text in enumerate(texts)], 'en'),
+        TextTable([(text_id, text.upper(), 1 if text_id > 5 else 0) for text_id, text in enumerate(texts)], 'ru')
+    ]
+    return container
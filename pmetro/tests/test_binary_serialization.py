@@ -0,0 +1,53 @@
+from pmetro.binary_serialization import encode_scheme, decode_scheme, encode_transport, decode_transport, \
+    encode_text_table, decode_text_table, encode_text_types, decode_text_types
+from pmetro.serialization import as_json
+from pmetro.tests.samples import create_scheme, create_transport, create_map_container
+
+
+def test_scheme_round_trip_matches_json():
+    scheme = create_scheme()
+    decoded = decode_scheme(encode_scheme(scheme))
+    assert as_json(decoded) == as_json(scheme)
+
+
+def test_scheme_round_trip_keeps_int_points():
+    decoded = decode_scheme(encode_scheme(create_scheme()))
+    points = decoded.lines[0].segments[0][2]
+    assert points == [(100, 100), (200, 120)]
+    assert all(isinstance(value, int) for point in points for value in point)
+    assert all(isinstance(value, float) for point in decoded.lines[0].segments[1][2] for value in point)
+
+
+def test_scheme_round_trip_keeps_mixed_points():
+    scheme = create_scheme()
+    segment = scheme.lines[0].segments[0]
+    scheme.lines[0].segments[0] = (segment[0], segment[1], [(100, 100), (150.5, 110.0), (200, 120)], segment[3])
+    for coords_codec in (False, True):
+        decoded = decode_scheme(encode_scheme(scheme, coords_codec))
+        assert as_json(decoded) == as_json(scheme)
+        points = decoded.lines[0].segments[0][2]
+        assert [type(value) for point in points for value in point] == [int, int, float, float, int, int]
+
+
+def test_scheme_round_trip_with_coords_codec():
+    scheme = create_scheme()
+    decoded = decode_scheme(encode_scheme(scheme, coords_codec=True))
+    assert as_json(decoded) == as_json(scheme)
+
+
+def test_transport_round_trip_matches_json():
+    transport = create_transport()
+    decoded = decode_transport(encode_transport(transport))
+    assert as_json(decoded) == as_json(transport)
+
+
+def test_transport_round_trip_keeps_negative_delays():
+    decoded = decode_transport(encode_transport(create_transport()))
+    assert [delay for from_uid, to_uid, delay in decoded.lines[0].segments] == [120, 120, -1, None]
+    assert [delay for from_uid, to_uid, delay, is_visible in decoded.transfers] == [180, -1, None]
+
+
+def test_text_table_round_trip():
+    texts = create_map_container().texts[1].texts
+    assert decode_text_table(encode_text_table(texts)) == [text for text_id, text, text_type in texts]
+    assert decode_text_types(encode_text_types(texts)) == [text_type for text_id, text, text_type in texts]
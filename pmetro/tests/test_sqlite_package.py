@@ -0,0 +1,119 @@
+import codecs
+import json
+import os
+import sqlite3
+
+from pmetro.serialization import store_model
+from pmetro.sqlite_package import write_sqlite_package, SQLITE_PACKAGE_VERSION
+from pmetro.tests.samples import create_map_container
+
+
+def load_json(path):
+    with codecs.open(path, 'r', 'utf-8') as f:
+        return json.load(f)
+
+
+def create_package(tmp_path):
+    container = create_map_container()
+    model_path = str(tmp_path / 'model')
+    os.makedirs(os.path.join(model_path, 'res', 'stations'))
+    with open(os.path.join(model_path, 'res', 'stations', 'a.png'), 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\nstation')
+    with open(os.path.join(model_path, 'res', 'metro.svg'), 'wb') as f:
+        f.write(b'<svg/>')
+
+    store_model(container, model_path)
+    package_path = str(tmp_path / 'Moscow.sqlite')
+    write_sqlite_package(container, model_path, package_path)
+    return model_path, sqlite3.connect(package_path)
+
+
+def test_meta_matches_json(tmp_path):
+    model_path, cnn = create_package(tmp_path)
+    meta = dict((key, json.loads(value)) for key, value in cnn.execute('SELECT key, value FROM meta'))
+    assert meta.pop('package_version') == SQLITE_PACKAGE_VERSION
+    assert meta == load_json(os.path.join(model_path, 'index.json'))
+
+    images = [dict(zip(('caption', 'line', 'station', 'image'), row))
+              for row in cnn.execute('SELECT caption, line, station, image FROM image ORDER BY rowid')]
+    assert images == load_json(os.path.join(model_path, 'images.json'))
+
+
+def test_texts_match_json(tmp_path):
+    model_path, cnn = create_package(tmp_path)
+    for locale in ('en', 'ru'):
+        texts = dict((str(text_id), text) for text_id, text in cnn.execute(
+            'SELECT text_id, text FROM text WHERE locale = ? ORDER BY text_id', (locale,)))
+        assert texts == load_json(os.path.join(model_path, 'texts', locale + '.json'))
+
+
+def test_scheme_stations_and_segments_match_json(tmp_path):
+    model_path, cnn = create_package(tmp_path)
+    scheme = load_json(os.path.join(model_path, 'schemes', 'metro.json'))
+    properties = json.loads(cnn.execute('SELECT properties FROM scheme WHERE name = ?', ('metro',)).fetchone()[0])
+    assert properties == dict((k, v) for k, v in scheme.items() if k not in ('lines', 'transfers'))
+
+    lines = cnn.execute('SELECT line_id, name, text_id, line_color FROM line WHERE scheme = ? ORDER BY line_id',
+                        ('metro',)).fetchall()
+    assert [(name, text_id, line_color) for line_id, name, text_id, line_color in lines] == [
+        (line['name'], line['text_id'], line['line_color']) for line in scheme['lines']]
+
+    for (line_id, name, text_id, line_color), line in zip(lines, scheme['lines']):
+        stations = [{
+            'uid': uid,
+            'name': station_name,
+            'text_id': station_text_id,
+            'coord': json.loads(coord) if coord is not None else None,
+            'rect': json.loads(rect) if rect is not None else None,
+            'is_working': bool(is_working)
+        } for uid, station_name, station_text_id, coord, rect, is_working in cnn.execute(
+            'SELECT uid, name, text_id, coord, rect, is_working FROM station WHERE line_id = ? ORDER BY rowid',
+            (line_id,))]
+        assert stations == line['stations']
+
+        segments = [[from_uid, to_uid, json.loads(points), bool(is_working)]
+                    for from_uid, to_uid, points, is_working in cnn.execute(
+                        'SELECT from_uid, to_uid, points, is_working FROM segment WHERE line_id = ? ORDER BY rowid',
+                        (line_id,))]
+        assert segments == line['segments']
+
+    transfers = [[from_uid, to_uid, json.loads(from_coord) if from_coord else None,
+                  json.loads(to_coord) if to_coord else None]
+                 for from_uid, to_uid, from_coord, to_coord in cnn.execute(
+                     'SELECT from_uid, to_uid, from_coord, to_coord FROM transfer ORDER BY rowid')]
+    assert transfers == scheme['transfers']
+
+
+def test_transport_stations_and_segments_match_json(tmp_path):
+    model_path, cnn = create_package(tmp_path)
+    transport = load_json(os.path.join(model_path, 'transports', 'metro.json'))
+    lines = cnn.execute('SELECT line_id, name, scheme, delays FROM transport_line WHERE transport = ? ' +
+                        'ORDER BY line_id', ('metro',)).fetchall()
+    assert len(lines) == len(transport['lines'])
+
+    for (line_id, name, scheme, delays), line in zip(lines, transport['lines']):
+        assert (name, scheme, json.loads(delays)) == (line['name'], line['scheme'], line['delays'])
+        stations = [list(row) for row in cnn.execute(
+            'SELECT uid, name, text_id FROM transport_station WHERE line_id = ? ORDER BY rowid', (line_id,))]
+        assert stations == line['stations']
+        segments = [list(row) for row in cnn.execute(
+            'SELECT from_uid, to_uid, delay FROM transport_segment WHERE line_id = ? ORDER BY rowid', (line_id,))]
+        assert segments == line['segments']
+        assert [type(delay) for from_uid, to_uid, delay in segments] == [
+            type(delay) for from_uid, to_uid, delay in line['segments']]
+
+    transfers = [[from_uid, to_uid, delay, bool(is_visible)] for from_uid, to_uid, delay, is_visible in cnn.execute(
+        'SELECT from_uid, to_uid, delay, is_visible FROM transport_transfer WHERE transport = ? ORDER BY rowid',
+        ('metro',))]
+    assert transfers == transport['transfers']
+
+
+def test_resources_match_files(tmp_path):
+    model_path, cnn = create_package(tmp_path)
+    resources = dict((name, bytes(data)) for name, data in cnn.execute('SELECT name, data FROM resource'))
+    files = dict()
+    for root, dirs, file_names in os.walk(os.path.join(model_path, 'res')):
+        for file_name in file_names:
+            with open(os.path.join(root, file_name), 'rb') as f:
+                files[os.path.relpath(os.path.join(root, file_name), model_path).replace('\\', '/')] = f.read()
+    assert resources == files
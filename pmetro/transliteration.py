@@ -0,0 +1,110 @@
+import functools
+import sqlite3
+
+import transliterate
+from transliterate.base import TranslitLanguagePack
+from transliterate.utils import get_language_pack
+
+DEFAULT_CACHE_SIZE = 64 * 1024
+
+
+class TranslitTable(object):
+    def __init__(self, language_code):
+        pack_class = get_language_pack(language_code)
+        if pack_class is None:
+            raise ValueError('Language pack for code %s is not found' % language_code)
+
+        self.language_code = language_code
+        self.pack = pack_class()
+        self.table = self.__compile(self.pack)
+
+    def translit(self, text):
+        if self.table is None:
+            return self.pack.translit(text, reversed=True)
+        return text.translate(self.table)
+
+    @staticmethod
+    def __compile(pack):
+        if type(pack).translit is not TranslitLanguagePack.translit:
+            return None
+
+        rules = [
+            getattr(pack, 'reversed_specific_translation_table', None) or {},
+            pack.reversed_specific_pre_processor_mapping or {},
+            pack.reversed_pre_processor_mapping or {},
+            pack.reversed_translation_table
+        ]
+
+        chars = set()
+        for rule in rules:
+            for key in rule:
+                if isinstance(key, int):
+                    chars.add(chr(key))
+                    continue
+                if len(key) != 1:
+                    # multi-character rules may match across characters, so the
+                    # pack cannot be reduced to a single translation table
+                    return None
+                chars.add(key)
+
+        return dict((ord(ch), pack.translit(ch, reversed=True)) for ch in chars)
+
+
+class TransliterationEngine(object):
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, cache_db=None):
+        self.__tables = dict()
+        self.__cnn = None
+        self.__cursor = None
+        self.__cached_translit = functools.lru_cache(maxsize=cache_size)(self.__translit)
+        if cache_db is not None:
+            self.__open_cache(cache_db)
+
+    def translit(self, text, language_code):
+        return self.__cached_translit(text, language_code)
+
+    def flush(self):
+        if self.__cnn is not None:
+            self.__cnn.commit()
+
+    def close(self):
+        if self.__cnn is not None:
+            self.__cnn.commit()
+            self.__cnn.close()
+            self.__cnn = None
+            self.__cursor = None
+
+    def __translit(self, text, language_code):
+        if self.__cursor is not None:
+            self.__cursor.execute('SELECT value FROM translit WHERE text = ? AND language = ?',
+                                  (text, language_code))
+            row = self.__cursor.fetchone()
+            if row is not None:
+                return row[0]
+
+        value = self.__get_table(language_code).translit(text)
+
+        if self.__cursor is not None:
+            self.__cursor.execute('INSERT OR REPLACE INTO translit VALUES (?,?,?)', (text, language_code, value))
+
+        return value
+
+    def __get_table(self, language_code):
+        if language_code not in self.__tables:
+            self.__tables[language_code] = TranslitTable(language_code)
+        return self.__tables[language_code]
+
+    def __open_cache(self, cache_db):
+        self.__cnn = sqlite3.connect(cache_db)
+        self.__cursor = self.__cnn.cursor()
+        self.__cursor.execute('CREATE TABLE IF NOT EXISTS translit (' +
+                              '   text text, language text, value text, PRIMARY KEY (text, language))')
+        self.__cursor.execute('CREATE TABLE IF NOT EXISTS translit_version (version text)')
+
+        self.__cursor.execute('SELECT version FROM translit_version')
+        row = self.__cursor.fetchone()
+        version = transliterate.__version__
+        if row is None or row[0] != version:
+            self.__cursor.execute('DELETE FROM translit')
+            self.__cursor.execute('DELETE FROM translit_version')
+            self.__cursor.execute('INSERT INTO translit_version VALUES (?)', (version,))
+        self.__cnn.commit()
@@ -1,5 +1,7 @@
 import codecs
 import json
+import math
+import os
 
 import svgwrite
 
@@ -14,7 +16,7 @@ __FONT_WIDTH = 0.3
 __FONT_HEIGHT = 0.9
 
 
-def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=False):
+def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=False, tile_size=None):
     style = {
         'brush': 'none',
         'pen': 'none',
@@ -22,7 +24,8 @@ def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=Fa
         'opaque': 100,
         'size': (0, 0),
         'rect': (0, 0, 0, 0),
-        'angle': 0
+        'angle': 0,
+        'bbox': None
     }
 
     container_commands = {
@@ -55,6 +58,8 @@ def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=Fa
     dwg.add(root_container)
     root = root_container
 
+    tiles = VecTileGrid(tile_size, root_container) if tile_size else None
+
     line_index = 0
     for l in read_all_lines(vec_file):
         line_index += 1
@@ -73,9 +78,17 @@ def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=Fa
             continue
 
         if cmd in container_commands:
+            parent = root
             root = container_commands[cmd](dwg, root, txt, style)
+            if tiles is not None:
+                tiles.add_container(root, parent)
         else:
+            style['bbox'] = None
+            elements_count = len(root.elements)
             commands[cmd](dwg, root, txt, style)
+            if tiles is not None:
+                for element in root.elements[elements_count:]:
+                    tiles.add(element, root, style['bbox'])
 
     x0, y0, x1, y1 = style['rect']
     w, h = style['size']
@@ -91,6 +104,9 @@ def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=Fa
 
     dwg.saveas(svg_file)
 
+    if tiles is not None:
+        meta['tiles'] = tiles.save(svg_file, dwg.attribs['width'], dwg.attribs['height'])
+
     if save_meta:
         with codecs.open(svg_file + '.meta.json', 'w', encoding='utf-8') as f:
             f.write(json.dumps(meta, ensure_ascii=False))
@@ -98,6 +114,83 @@ def convert_vec_to_svg(vec_file, svg_file, log, save_meta=False, shift_origin=Fa
     return meta
 
 
+class VecTileGrid(object):
+    def __init__(self, tile_size, root_container):
+        self.tile_size = tile_size
+        self.root_container = root_container
+        self.containers = dict()
+        self.cells = dict()
+        self.elements = []
+        self.unbounded = []
+
+    def add_container(self, container, parent):
+        self.containers[id(container)] = (container, parent)
+
+    def add(self, element, container, bbox):
+        index = len(self.elements)
+        self.elements.append((element, container))
+
+        if bbox is None:
+            self.unbounded.append(index)
+            return
+
+        x0, y0, x1, y1 = bbox
+        for column in range(self.__cell(x0), self.__cell(x1) + 1):
+            for row in range(self.__cell(y0), self.__cell(y1) + 1):
+                self.cells.setdefault((column, row), []).append(index)
+
+    def save(self, svg_file, width, height):
+        base_name, ext = os.path.splitext(svg_file)
+        if not any(self.cells) and any(self.unbounded):
+            self.cells[(0, 0)] = []
+
+        tiles = []
+        for column, row in sorted(self.cells):
+            tile_file = '{0}.{1}_{2}{3}'.format(base_name, column, row, ext)
+            self.__create_tile(self.cells[(column, row)], width, height).saveas(tile_file)
+            tiles.append({
+                'file': os.path.basename(tile_file),
+                'column': column,
+                'row': row,
+                'rect': [column * self.tile_size, row * self.tile_size,
+                         (column + 1) * self.tile_size, (row + 1) * self.tile_size]
+            })
+
+        index = {'tile_size': self.tile_size, 'image': os.path.basename(svg_file), 'tiles': tiles}
+        with codecs.open(svg_file + '.tiles.json', 'w', encoding='utf-8') as f:
+            f.write(json.dumps(index, ensure_ascii=False))
+
+        return os.path.basename(svg_file) + '.tiles.json'
+
+    def __create_tile(self, indexes, width, height):
+        dwg = svgwrite.Drawing(profile='tiny', size=(width, height))
+        tile_containers = dict()
+        for index in sorted(set(indexes + self.unbounded)):
+            element, container = self.elements[index]
+            self.__get_tile_container(dwg, tile_containers, container).add(element)
+        return dwg
+
+    def __get_tile_container(self, dwg, tile_containers, container):
+        if id(container) in tile_containers:
+            return tile_containers[id(container)]
+
+        if container is self.root_container:
+            parent = dwg
+        else:
+            parent = self.__get_tile_container(dwg, tile_containers, self.containers[id(container)][1])
+
+        tile_container = dwg.g()
+        if 'transform' in container.attribs:
+            tile_container.attribs['transform'] = container.attribs['transform']
+        parent.add(tile_container)
+
+        tile_containers[id(container)] = tile_container
+        return tile_container
+
+    def __cell(self, value):
+        return int(math.floor(value / self.tile_size))
+
+
 def __vec_cmd_size(dwg, root, text, style):
     w, h = as_list(text, 'x')
     style['size'] = (int(w), int(h))
@@ -127,7 +220,7 @@ def __vec_cmd_text_out(dwg, root, text, style):
         font_weight = 'bold'
     txt = txt.strip('\'')
 
-    __update_bounding_box((pos, vector_add(pos, (font_size * len(text) * __FONT_WIDTH, 0))), style)
+    __update_bounding_box((pos, vector_add(pos, (font_size * len(text) * __FONT_WIDTH, 0))), style, font_size)
     root.add(dwg.text(text=txt,
                       insert=pos,
                       font_family=font_style,
@@ -153,7 +246,7 @@ def __vec_cmd_angle_text_out(dwg, root, text, style):
         font_weight = 'bold'
     txt = txt.strip('\'')
 
-    __update_bounding_box((pos,), style)
+    __update_bounding_box((pos,), style, float(font_size) * (len(txt) * __FONT_WIDTH + 1))
     root.add(dwg.text(text=txt,
                       insert=pos,
                       font_family=font_style,
@@ -166,7 +259,7 @@ def __vec_cmd_angle_text_out(dwg, root, text, style):
 
 def __vec_cmd_polygon(dwg, root, text, style):
     pts, width = as_point_list_with_width(text)
-    __update_bounding_box(pts, style)
+    __update_bounding_box(pts, style, float(width) / 2)
     root.add(dwg.polygon(points=pts,
                          stroke=style['pen'],
                          stroke_width=width,
@@ -176,7 +269,7 @@ def __vec_cmd_polygon(dwg, root, text, style):
 
 def __vec_cmd_line(dwg, root, text, style):
     pts, width = as_point_list_with_width(text)
-    __update_bounding_box(pts, style)
+    __update_bounding_box(pts, style, float(width) / 2)
     root.add(dwg.polyline(points=pts,
                           stroke=style['pen'],
                           stroke_width=width,
@@ -186,7 +279,7 @@ def __vec_cmd_line(dwg, root, text, style):
 
 def __vec_cmd_spline(dwg, root, text, style):
     pts, width = as_point_list_with_width(text)
-    __update_bounding_box(pts, style)
+    __update_bounding_box(pts, style, float(width) / 2)
     c = cubic_interpolate(pts)
     root.add(dwg.polyline(points=c,
                           stroke=style['pen'],
@@ -197,7 +290,7 @@ def __vec_cmd_spline(dwg, root, text, style):
 
 def __vec_cmd_line_dashed(dwg, root, text, style):
     pts, width = as_point_list_with_width(text)
-    __update_bounding_box(pts, style)
+    __update_bounding_box(pts, style, float(width) / 2)
     root.add(dwg.polyline(points=pts,
                           stroke=style['pen'],
                           stroke_width=width,
@@ -241,7 +334,7 @@ def __vec_cmd_stairs(dwg, root, text, style):
 
 def __vec_cmd_arrow(dwg, root, text, style):
     pts, width = as_point_list_with_width(text)
-    __update_bounding_box(pts, style)
+    __update_bounding_box(pts, style, float(width) / 2)
 
     start = pts[len(pts) - 2]
     end = pts[len(pts) - 1]
@@ -333,15 +426,38 @@ def __vec_cmd_empty(dwg, root, text, style):
     pass
 
 
-def __update_bounding_box(points, style):
+def __update_bounding_box(points, style, padding=0):
+    bbox = __get_bounding_box(points, style)
+    if bbox is None:
+        return
+
+    x0, y0, x1, y1 = style['rect']
+    bx0, by0, bx1, by1 = bbox
+    style['rect'] = (min(x0, bx0), min(y0, by0), max(x1, bx1), max(y1, by1))
+
+    bx0, by0, bx1, by1 = bx0 - padding, by0 - padding, bx1 + padding, by1 + padding
+    bbox = (bx0, by0, bx1, by1)
+
+    if style['bbox'] is not None:
+        px0, py0, px1, py1 = style['bbox']
+        bbox = (min(px0, bx0), min(py0, by0), max(px1, bx1), max(py1, by1))
+    style['bbox'] = bbox
+
+
+def __get_bounding_box(points, style):
     w, h = style['size']
     angle = style['angle']
-    x0, y0, x1, y1 = style['rect']
 
     c = (w / 2, h / 2)
 
+    bbox = None
     for p in points:
         x, y = vector_add(vector_rotate(vector_sub(p, c), -angle), c)
+        if bbox is None:
+            bbox = (x, y, x, y)
+            continue
+
+        x0, y0, x1, y1 = bbox
         if x < x0:
             x0 = x
         if y < y0:
@@ -351,7 +467,8 @@ def __update_bounding_box(points, style):
             x1 = x
         if y > y1:
             y1 = y
+        bbox = (x0, y0, x1, y1)
 
-    style['rect'] = (x0, y0, x1, y1)
+    return bbox
 
 
@@ -0,0 +1,104 @@
+import os
+import stat
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+ZIP_DEFAULT_POLICY = (ZIP_DEFLATED, 6)
+ZIP_POLICY = {
+    '.png': (ZIP_STORED, None),
+    '.jpg': (ZIP_STORED, None),
+    '.gif': (ZIP_STORED, None),
+    '.zip': (ZIP_STORED, None),
+    '.pmz': (ZIP_STORED, None),
+    '.json': (ZIP_DEFLATED, 9),
+    '.svg': (ZIP_DEFLATED, 9),
+}
+
+ZIP_DOS_DATE = (1 << 5) | 1
+ZIP_DOS_TIME = 0
+ZIP_FILE_MODE = stat.S_IFREG | 0o644
+ZIP_VERSION = 20
+ZIP_CREATE_SYSTEM_UNIX = 3
+ZIP_UTF8_FLAG = 0x800
+ZIP_MAX_SIZE = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+DEFAULT_ZIP_WORKERS = 4
+
+__LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+__CENTRAL_HEADER = struct.Struct('<4s4B4H3L5H2L')
+__END_RECORD = struct.Struct('<4s4H2LH')
+
+
+def write_zip(zip_path, members, policy=None, workers=DEFAULT_ZIP_WORKERS):
+    if policy is None:
+        policy = ZIP_POLICY
+    if len(members) > ZIP_MAX_ENTRIES:
+        raise ValueError('Too many zip members %s for %s, zip64 is not supported' % (len(members), zip_path))
+
+    def compress(member):
+        return __compress_member(member[0], member[1], policy)
+
+    entries = []
+    with open(zip_path, 'wb') as f:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for name, method, crc, size, data in executor.map(compress, members):
+                offset = f.tell()
+                if offset > ZIP_MAX_SIZE:
+                    raise ValueError('Zip file %s is too large, zip64 is not supported' % zip_path)
+                name_bytes, flags = __encode_name(name)
+                f.write(__LOCAL_HEADER.pack(
+                    b'PK\x03\x04', ZIP_VERSION, flags, method, ZIP_DOS_TIME, ZIP_DOS_DATE,
+                    crc, len(data), size, len(name_bytes), 0))
+                f.write(name_bytes)
+                f.write(data)
+                entries.append((name_bytes, flags, method, crc, len(data), size, offset))
+
+        directory_offset = f.tell()
+        for name_bytes, flags, method, crc, compressed_size, size, offset in entries:
+            f.write(__CENTRAL_HEADER.pack(
+                b'PK\x01\x02', ZIP_VERSION, ZIP_CREATE_SYSTEM_UNIX, ZIP_VERSION, 0, flags, method, ZIP_DOS_TIME,
+                ZIP_DOS_DATE, crc, compressed_size, size, len(name_bytes), 0, 0, 0, 0, ZIP_FILE_MODE << 16, offset))
+            f.write(name_bytes)
+
+        directory_size = f.tell() - directory_offset
+        if directory_offset + directory_size > ZIP_MAX_SIZE:
+            raise ValueError('Zip file %s is too large, zip64 is not supported' % zip_path)
+        f.write(__END_RECORD.pack(
+            b'PK\x05\x06', 0, 0, len(entries), len(entries), directory_size, directory_offset, 0))
+
+
+def get_member_policy(member_name, policy=None):
+    if policy is None:
+        policy = ZIP_POLICY
+    return policy.get(os.path.splitext(member_name)[1].lower(), ZIP_DEFAULT_POLICY)
+
+
+def __compress_member(member_name, source, policy):
+    if isinstance(source, bytes):
+        data = source
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+
+    if len(data) > ZIP_MAX_SIZE:
+        raise ValueError('Zip member %s is too large, zip64 is not supported' % member_name)
+
+    method, level = get_member_policy(member_name, policy)
+    crc = zlib.crc32(data) & 0xFFFFFFFF
+    if method == ZIP_DEFLATED:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) < len(data):
+            return member_name, ZIP_DEFLATED, crc, len(data), compressed
+    return member_name, ZIP_STORED, crc, len(data), data
+
+
+def __encode_name(member_name):
+    try:
+        return member_name.encode('ascii'), 0
+    except UnicodeEncodeError:
+        return member_name.encode('utf-8'), ZIP_UTF8_FLAG
@@ -6,10 +6,14 @@ class MapCatalog(object):
     def __init__(self, maps=None):
         if not maps:
             maps = []
-        self.maps = maps
+        self.maps = []
+        self.__by_file = dict()
+        self.__by_id = dict()
+        for map_info in maps:
+            self.add_map(map_info)
 
     def add(self, uid, file_name, size, timestamp):
-        self.maps.append({
+        self.add_map({
             'city_id': uid,
             'file': file_name,
             'size': size,
@@ -19,6 +23,8 @@ class MapCatalog(object):
 
     def add_map(self, map_info):
         self.maps.append(map_info)
+        self.__by_file.setdefault(map_info['file'], map_info)
+        self.__by_id.setdefault(map_info['map_id'], []).append(map_info)
 
     def save(self, path):
         with codecs.open(path, 'w', 'utf-8') as f:
@@ -32,7 +38,12 @@ class MapCatalog(object):
 
     def load(self, path):
         with codecs.open(path, 'r', 'utf-8') as f:
-            self.maps = json.load(f)['maps']
+            maps = json.load(f)['maps']
+        self.maps = []
+        self.__by_file = dict()
+        self.__by_id = dict()
+        for map_info in maps:
+            self.add_map(map_info)
 
     def get_timestamp(self):
         timestamp = 0
@@ -45,16 +56,16 @@ class MapCatalog(object):
         return json.dumps({'maps': self.maps, 'timestamp': self.get_timestamp()}, ensure_ascii=False)
 
     def find_by_file(self, file_name):
-        for m in self.maps:
-            if m['file'] == file_name:
-                return m
+        return self.__by_file.get(file_name)
 
     def find_list_by_id(self, map_id):
-        lst = []
-        for m in self.maps:
-            if m['map_id'] == map_id:
-                lst.append(m)
-        return lst
+        return list(self.__by_id.get(map_id, []))
+
+    def get_files(self):
+        return set(self.__by_file)
+
+    def get_map_ids(self):
+        return set(self.__by_id)
 
     @staticmethod
     def clone(src_map):
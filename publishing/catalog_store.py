@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+
+from publishing.catalog import MapCatalog
+
+
+class CatalogStore(object):
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.__cnn = sqlite3.connect(db_path)
+        self.__cnn.execute('CREATE TABLE IF NOT EXISTS map (' +
+                           '   file text PRIMARY KEY, map_id text, city_id int, size int, timestamp real, data text)')
+        self.__cnn.execute('CREATE INDEX IF NOT EXISTS IX_map_id ON map (map_id)')
+        self.__cnn.execute('CREATE INDEX IF NOT EXISTS IX_map_city_id ON map (city_id)')
+        self.__cnn.execute('CREATE INDEX IF NOT EXISTS IX_map_timestamp ON map (timestamp)')
+        self.__cnn.commit()
+
+    def load(self):
+        return MapCatalog(self.__query('SELECT data FROM map ORDER BY rowid'))
+
+    def save_map(self, map_info):
+        with self.__cnn:
+            self.__insert(map_info)
+
+    def remove_map(self, file_name):
+        with self.__cnn:
+            self.__cnn.execute('DELETE FROM map WHERE file = ?', (file_name,))
+
+    def replace(self, catalog):
+        with self.__cnn:
+            self.__cnn.execute('DELETE FROM map')
+            for map_info in catalog.maps:
+                self.__insert(map_info)
+
+    def find_by_file(self, file_name):
+        maps = self.__query('SELECT data FROM map WHERE file = ?', (file_name,))
+        return maps[0] if maps else None
+
+    def find_list_by_id(self, map_id):
+        return self.__query('SELECT data FROM map WHERE map_id = ? ORDER BY file', (map_id,))
+
+    def find_list_by_city_id(self, city_id):
+        return self.__query('SELECT data FROM map WHERE city_id = ? ORDER BY file', (city_id,))
+
+    def find_list_changed_since(self, timestamp):
+        return self.__query('SELECT data FROM map WHERE timestamp > ? ORDER BY timestamp, file', (timestamp,))
+
+    def export(self, index_path, timestamp_path=None):
+        catalog = self.load()
+        catalog.save(index_path + '.tmp')
+        os.replace(index_path + '.tmp', index_path)
+        if timestamp_path is not None:
+            catalog.save_timestamp(timestamp_path + '.tmp')
+            os.replace(timestamp_path + '.tmp', timestamp_path)
+
+    def close(self):
+        self.__cnn.close()
+
+    def __insert(self, map_info):
+        self.__cnn.execute('INSERT OR REPLACE INTO map VALUES (?,?,?,?,?,?)', (
+            map_info['file'],
+            map_info['map_id'],
+            map_info['city_id'],
+            map_info['size'],
+            map_info['timestamp'],
+            json.dumps(map_info, ensure_ascii=False)))
+
+    def __query(self, query, params=()):
+        return [json.loads(row[0]) for row in self.__cnn.execute(query, params)]
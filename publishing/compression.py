@@ -0,0 +1,65 @@
+import gzip
+import os
+
+from publishing.manifest import INTERNAL_FILE_SUFFIXES, MANIFEST_FILE
+from publishing.snapshots import SNAPSHOTS_FOLDER
+
+GZIP_EXTENSIONS = ('.json',)
+GZIP_EXCLUDED_FOLDERS = (SNAPSHOTS_FOLDER,)
+GZIP_EXCLUDED_SUFFIXES = INTERNAL_FILE_SUFFIXES
+
+
+def compress_published_files(publishing_path, manifest, logger):
+    __remove_orphaned_files(publishing_path)
+
+    original_size = 0
+    compressed_size = 0
+    for name, entry in sorted(manifest.files.items()):
+        if not name.endswith(GZIP_EXTENSIONS) or name.endswith(GZIP_EXCLUDED_SUFFIXES):
+            continue
+
+        file_path = os.path.join(publishing_path, name)
+        if entry.get('gzip') is False or (entry.get('gzip') and os.path.isfile(file_path + '.gz')):
+            continue
+
+        entry['gzip'] = write_gzip_sibling(file_path)
+        if not entry['gzip']:
+            continue
+
+        file_size = os.path.getsize(file_path)
+        gzip_size = os.path.getsize(file_path + '.gz')
+        original_size += file_size
+        compressed_size += gzip_size
+        logger.info('Compressed %s: %s -> %s bytes, saved %s' % (name, file_size, gzip_size, file_size - gzip_size))
+
+    if original_size > 0:
+        logger.info('Compressed published files: %s -> %s bytes, saved %s' % (
+            original_size, compressed_size, original_size - compressed_size))
+
+
+def write_gzip_sibling(file_path):
+    gzip_path = file_path + '.gz'
+    tmp_path = gzip_path + '.tmp'
+    with open(file_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        with gzip.GzipFile(filename='', mode='wb', compresslevel=9, fileobj=dst, mtime=0) as gz:
+            gz.write(src.read())
+
+    if os.path.getsize(tmp_path) >= os.path.getsize(file_path):
+        os.remove(tmp_path)
+        if os.path.isfile(gzip_path):
+            os.remove(gzip_path)
+        return False
+
+    os.replace(tmp_path, gzip_path)
+    return True
+
+
+def __remove_orphaned_files(publishing_path):
+    for root, dirs, files in os.walk(publishing_path):
+        if root == publishing_path:
+            dirs[:] = [d for d in dirs if d not in GZIP_EXCLUDED_FOLDERS]
+        for file_name in files:
+            if not file_name.endswith('.gz'):
+                continue
+            if file_name[:-3] not in files or (root == publishing_path and file_name[:-3] == MANIFEST_FILE):
+                os.remove(os.path.join(root, file_name))
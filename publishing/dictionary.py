@@ -0,0 +1,149 @@
+import codecs
+import filecmp
+import hashlib
+import json
+import os
+import re
+import zipfile
+import zlib
+
+from pmetro.file_utils import get_file_ext, list_folder_files
+from pmetro.zip_writer import write_zip, ZIP_POLICY, ZIP_STORED
+
+DICTIONARY_FOLDER = 'dictionaries'
+DICTIONARY_EXTENSION = 'zdict'
+DICTIONARY_PACKAGE_EXTENSION = 'zdz'
+DICTIONARY_PACKAGE_INDEX = 'dictionary.json'
+DICTIONARY_MEMBER_SUFFIX = '.zd'
+DICTIONARY_MEMBER_EXTENSIONS = ('.json',)
+DICTIONARY_MAX_MEMBER_SIZE = 64 * 1024
+DICTIONARY_SIZE = 32 * 1024
+DICTIONARY_LEVEL = 9
+
+__MAX_NGRAM_TOKENS = 6
+__MIN_SEGMENT_SIZE = 4
+__MAX_SEGMENT_SIZE = 128
+__TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null|\s+|.', re.S)
+
+
+class TextDictionary(object):
+    def __init__(self, data):
+        self.data = data
+        self.version = hashlib.sha1(data).hexdigest()[:16]
+
+    def get_file_name(self):
+        return '{0}.{1}'.format(self.version, DICTIONARY_EXTENSION)
+
+    def compress(self, data):
+        compressor = zlib.compressobj(DICTIONARY_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=self.data)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data):
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=self.data)
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def save(self, path):
+        with open(path + '.tmp', 'wb') as f:
+            f.write(self.data)
+        os.replace(path + '.tmp', path)
+
+    def publish(self, root_path):
+        dictionaries_path = os.path.join(root_path, DICTIONARY_FOLDER)
+        if not os.path.isdir(dictionaries_path):
+            os.mkdir(dictionaries_path)
+        file_path = os.path.join(dictionaries_path, self.get_file_name())
+        if not os.path.isfile(file_path):
+            self.save(file_path)
+        return DICTIONARY_FOLDER + '/' + self.get_file_name()
+
+
+def load_dictionary(path):
+    with open(path, 'rb') as f:
+        return TextDictionary(f.read())
+
+
+def is_dictionary_member(member_name, size):
+    return member_name.lower().endswith(DICTIONARY_MEMBER_EXTENSIONS) and size <= DICTIONARY_MAX_MEMBER_SIZE
+
+
+def load_dictionary_samples(maps_path):
+    samples = []
+    for map_file in sorted(f for f in os.listdir(maps_path) if get_file_ext(os.path.join(maps_path, f)) == 'zip'):
+        with zipfile.ZipFile(os.path.join(maps_path, map_file)) as zf:
+            for info in zf.infolist():
+                if is_dictionary_member(info.filename, info.file_size):
+                    samples.append(zf.read(info))
+    return samples
+
+
+def train_dictionary(samples, size=DICTIONARY_SIZE):
+    frequencies = dict()
+    for sample in samples:
+        tokens = __TOKEN_PATTERN.findall(sample)
+        segments = set()
+        for start in range(len(tokens)):
+            segment = b''
+            for token in tokens[start:start + __MAX_NGRAM_TOKENS]:
+                segment += token
+                if len(segment) > __MAX_SEGMENT_SIZE:
+                    break
+                if len(segment) >= __MIN_SEGMENT_SIZE:
+                    segments.add(segment)
+        for segment in segments:
+            frequencies[segment] = frequencies.get(segment, 0) + 1
+
+    scored = sorted(((count - 1) * len(segment), segment) for segment, count in frequencies.items() if count > 1)
+
+    selected = []
+    selected_size = 0
+    for score, segment in reversed(scored):
+        if selected_size >= size:
+            break
+        if any(segment in s for s in selected):
+            continue
+        selected.append(segment)
+        selected_size += len(segment)
+
+    return TextDictionary(b''.join(reversed(selected))[-size:])
+
+
+def write_dictionary_package(package_folder, package_path, dictionary):
+    members = []
+    for name in list_folder_files(package_folder):
+        file_path = os.path.join(package_folder, name)
+        if not is_dictionary_member(name, os.path.getsize(file_path)):
+            members.append((name, file_path))
+            continue
+        with open(file_path, 'rb') as f:
+            members.append((name + DICTIONARY_MEMBER_SUFFIX, dictionary.compress(f.read())))
+
+    index = {
+        'version': dictionary.version,
+        'suffix': DICTIONARY_MEMBER_SUFFIX,
+        'dictionary': DICTIONARY_FOLDER + '/' + dictionary.get_file_name()
+    }
+    members.append((DICTIONARY_PACKAGE_INDEX, json.dumps(index, ensure_ascii=False, indent=4).encode('utf-8')))
+
+    policy = dict(ZIP_POLICY)
+    policy[DICTIONARY_MEMBER_SUFFIX] = (ZIP_STORED, None)
+    write_zip(package_path + '.tmp', members, policy)
+    if os.path.isfile(package_path) and filecmp.cmp(package_path + '.tmp', package_path, shallow=False):
+        os.remove(package_path + '.tmp')
+        return
+    os.replace(package_path + '.tmp', package_path)
+
+
+def read_dictionary_package(package_path, dictionaries_root):
+    with zipfile.ZipFile(package_path) as zf:
+        index = json.loads(codecs.decode(zf.read(DICTIONARY_PACKAGE_INDEX), 'utf-8'))
+        dictionary = load_dictionary(os.path.join(dictionaries_root, index['dictionary']))
+        members = dict()
+        for name in zf.namelist():
+            if name == DICTIONARY_PACKAGE_INDEX:
+                continue
+            data = zf.read(name)
+            if name.endswith(index['suffix']):
+                members[name[:-len(index['suffix'])]] = dictionary.decompress(data)
+            else:
+                members[name] = data
+        return members
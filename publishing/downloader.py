@@ -32,7 +32,7 @@ MAP_NAME_FIX = {
 
 
 class MapDownloader(object):
-    def __init__(self, service_url, cache_path, temp_path, logger, geonames_provider):
+    def __init__(self, service_url, cache_path, temp_path, logger, geonames_provider, catalog_store=None):
 
         self.__download_chunk_size = 16 * 1024
         self.__service_url = service_url
@@ -41,13 +41,14 @@ class MapDownloader(object):
         self.__logger = logger
         self.__temp_path = temp_path
         self.__geonames_provider = geonames_provider
+        self.__catalog_store = catalog_store
 
     def refresh(self, force=False):
         remote_maps = list(self.__download_map_index())
         if force:
             old_catalog = MapCatalog()
         else:
-            old_catalog = load_catalog(self.__index_path)
+            old_catalog = self.__load_catalog()
 
         cache_catalog = MapCatalog()
         for new_map in remote_maps:
@@ -75,16 +76,30 @@ class MapDownloader(object):
 
                 self.__download_map(downloading_map)
                 cache_catalog.add_map(downloading_map)
+                if self.__catalog_store is not None:
+                    self.__catalog_store.save_map(downloading_map)
             else:
                 self.__logger.info('Map [%s] already downloaded.' % new_map['file'])
                 cache_catalog.add_map(old_map)
 
-        for old_map in old_catalog.maps:
-            if not any([m for m in remote_maps if m['file'] == old_map['file']]):
-                os.remove(os.path.join(self.__cache_path, old_map['file']))
-                self.__logger.warning('Map [%s] removed as obsolete.' % old_map['file'])
+        for obsolete_file in sorted(old_catalog.get_files() - set(m['file'] for m in remote_maps)):
+            os.remove(os.path.join(self.__cache_path, obsolete_file))
+            if self.__catalog_store is not None:
+                self.__catalog_store.remove_map(obsolete_file)
+            self.__logger.warning('Map [%s] removed as obsolete.' % obsolete_file)
 
-        cache_catalog.save(self.__index_path)
+        if self.__catalog_store is not None:
+            self.__catalog_store.replace(cache_catalog)
+            self.__catalog_store.export(self.__index_path)
+        else:
+            cache_catalog.save(self.__index_path)
+
+    def __load_catalog(self):
+        if self.__catalog_store is not None:
+            catalog = self.__catalog_store.load()
+            if any(catalog.maps):
+                return catalog
+        return load_catalog(self.__index_path)
 
     def __download_map_index(self):
 
@@ -0,0 +1,70 @@
+import codecs
+import json
+import os
+import time
+
+from pmetro.serialization import write_as_json_file, OUTPUT_PROFILE_PRETTY
+
+FEEDS_FOLDER = 'feeds'
+FEEDS_HISTORY = 'feeds.history.json'
+FEEDS_LATEST = 'latest.json'
+DEFAULT_FEED_DEPTH = 10
+
+
+def update_catalog_feeds(publishing_path, cache_path, maps_index, manifest, profile=OUTPUT_PROFILE_PRETTY,
+                         depth=DEFAULT_FEED_DEPTH):
+    feeds_path = os.path.join(publishing_path, FEEDS_FOLDER)
+    if not os.path.isdir(feeds_path):
+        os.mkdir(feeds_path)
+
+    history_path = os.path.join(cache_path, FEEDS_HISTORY)
+    history = __load_history(history_path)
+
+    maps = dict((m.file, dict(m.__dict__)) for m in maps_index)
+    is_changed = not any(history) or history[-1]['maps'] != maps
+    if not is_changed and os.path.isfile(os.path.join(feeds_path, FEEDS_LATEST)):
+        return history[-1]['version']
+
+    if is_changed:
+        version = history[-1]['version'] + 1 if any(history) else 1
+        history.append({'version': version, 'timestamp': int(time.time()), 'maps': maps})
+        history = history[-(depth + 1):]
+    version = history[-1]['version']
+
+    delta_files = set()
+    for previous in history[:-1]:
+        delta_file = 'delta.{0}.json'.format(previous['version'])
+        manifest.write_json(__create_delta(previous, history[-1]), os.path.join(feeds_path, delta_file), profile)
+        delta_files.add(delta_file)
+
+    for file_name in os.listdir(feeds_path):
+        if file_name.startswith('delta.') and file_name.replace('.gz', '') not in delta_files:
+            os.remove(os.path.join(feeds_path, file_name))
+
+    manifest.write_json(
+        {'version': version, 'deltas': sorted(previous['version'] for previous in history[:-1])},
+        os.path.join(feeds_path, FEEDS_LATEST),
+        profile)
+
+    write_as_json_file(history, history_path + '.tmp')
+    os.replace(history_path + '.tmp', history_path)
+    return version
+
+
+def __create_delta(previous, current):
+    old_maps = previous['maps']
+    new_maps = current['maps']
+    return {
+        'from': previous['version'],
+        'to': current['version'],
+        'added': [new_maps[f] for f in sorted(set(new_maps) - set(old_maps))],
+        'changed': [new_maps[f] for f in sorted(set(new_maps) & set(old_maps)) if new_maps[f] != old_maps[f]],
+        'removed': sorted(set(old_maps) - set(new_maps))
+    }
+
+
+def __load_history(history_path):
+    if not os.path.isfile(history_path):
+        return []
+    with codecs.open(history_path, 'r', 'utf-8') as f:
+        return json.load(f)
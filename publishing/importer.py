@@ -5,19 +5,38 @@ import sys
 
 from pmetro.file_utils import unzip_file, zip_folder, find_file_by_extension
 from pmetro.log import EmptyLog
-from pmetro.pmz_import import convert_map
+from pmetro.model_cache import MapModelCache
+from pmetro.options import ConvertOptions
+from pmetro.pmz_import import convert_map, reserialize_map
 from publishing.catalog import load_catalog, MapCatalog
+from publishing.dictionary import load_dictionary, write_dictionary_package, DICTIONARY_PACKAGE_EXTENSION
+from publishing.metadata import MapMetadataCache, METADATA_CACHE_FILE
+from publishing.packages import write_package_manifest, read_package_manifest, update_delta_packages, \
+    write_split_packages, remove_obsolete_packages, DELTAS_FOLDER, LITE_FOLDER, RESOURCES_FOLDER
 
 
 class MapImporter(object):
-    def __init__(self, import_path, temp_path, log, geoname_provider):
+    def __init__(self, import_path, temp_path, log, geoname_provider, options=None, catalog_store=None):
+        if options is None:
+            options = ConvertOptions()
         self.__log = log
+        self.__options = options
         self.__import_path = import_path
         self.__index_path = os.path.join(import_path, 'index.json')
         self.__timestamp_path = os.path.join(import_path, 'timestamp.json')
         self.__countries_path = os.path.join(import_path, 'countries.json')
+        self.__deltas_path = os.path.join(import_path, DELTAS_FOLDER)
         self.__temp_path = temp_path
         self.__geoname_provider = geoname_provider
+        self.__catalog_store = catalog_store
+        self.__metadata_cache = MapMetadataCache(os.path.join(import_path, METADATA_CACHE_FILE))
+        self.__text_dictionary = None
+        if options.text_dictionary_path is not None:
+            if os.path.isfile(options.text_dictionary_path):
+                self.__text_dictionary = load_dictionary(options.text_dictionary_path)
+                self.__text_dictionary.publish(import_path)
+            else:
+                log.warning('Text dictionary %s not found, dictionary packages skipped' % options.text_dictionary_path)
 
     @staticmethod
     def __create_map_description(map_info_list):
@@ -29,10 +48,10 @@ class MapImporter(object):
 
     def import_maps(self, cache_path, force=False):
         new_catalog = load_catalog(os.path.join(cache_path, 'index.json'))
-        old_catalog = load_catalog(self.__index_path)
+        old_catalog = self.__load_catalog()
 
         imported_catalog = MapCatalog()
-        for map_id in sorted(set([m['map_id'] for m in new_catalog.maps])):
+        for map_id in sorted(new_catalog.get_map_ids()):
             cached_list = new_catalog.find_list_by_id(map_id)
             cached_file_list = [x['file'] for x in cached_list]
 
@@ -50,11 +69,68 @@ class MapImporter(object):
                 self.__import_maps(cache_path, cached_list, new_map)
                 self.__log.info('Map(s) [%s] imported as [%s].' % (cached_file_list, map_file))
                 imported_catalog.add_map(new_map)
+                if self.__catalog_store is not None:
+                    self.__catalog_store.save_map(new_map)
             except:
                 self.__log.error('Map [%s] import skipped due error %s.' % (map_file, sys.exc_info()))
 
-        imported_catalog.save(self.__index_path)
-        imported_catalog.save_timestamp(self.__timestamp_path)
+        self.__save_catalog(imported_catalog)
+
+        if self.__options.model_cache_path is not None:
+            MapModelCache(self.__options.model_cache_path).remove_obsolete()
+
+    def reserialize_maps(self, model_cache_path):
+        catalog = self.__load_catalog()
+        for map_info in catalog.maps:
+            map_file = map_info['file']
+            # noinspection PyBroadException
+            try:
+                self.__reserialize_map(model_cache_path, map_info)
+                self.__log.info('Map [%s] re-serialized.' % map_file)
+                if self.__catalog_store is not None:
+                    self.__catalog_store.save_map(map_info)
+            except:
+                self.__log.error('Map [%s] re-serialization skipped due error %s.' % (map_file, sys.exc_info()))
+
+        self.__save_catalog(catalog)
+
+    def __load_catalog(self):
+        if self.__catalog_store is not None:
+            catalog = self.__catalog_store.load()
+            if any(catalog.maps):
+                return catalog
+        return load_catalog(self.__index_path)
+
+    def __save_catalog(self, catalog):
+        self.__metadata_cache.retain([m['file'] for m in catalog.maps])
+        self.__metadata_cache.save()
+        if self.__options.delta_depth > 0:
+            remove_obsolete_packages(self.__deltas_path, [m['file'] for m in catalog.maps])
+        if self.__options.lite_packages:
+            for folder in (LITE_FOLDER, RESOURCES_FOLDER):
+                remove_obsolete_packages(os.path.join(self.__import_path, folder), [m['file'] for m in catalog.maps])
+        if self.__catalog_store is not None:
+            self.__catalog_store.replace(catalog)
+            self.__catalog_store.export(self.__index_path, self.__timestamp_path)
+        else:
+            catalog.save(self.__index_path)
+            catalog.save_timestamp(self.__timestamp_path)
+
+    def __reserialize_map(self, model_cache_path, map_info):
+        importing_map_path = os.path.join(self.__import_path, map_info['file'])
+        temp_root = self.__create_tmp()
+        try:
+            converted_folder = os.path.join(temp_root, map_info['map_id'] + '.converted')
+            os.mkdir(converted_folder)
+
+            container = reserialize_map(map_info['file'], model_cache_path, converted_folder, self.__log,
+                                        self.__options, self.__get_package_path(importing_map_path))
+
+            self.__pack_map(converted_folder, importing_map_path, map_info)
+            self.__metadata_cache.put(importing_map_path, container.meta.to_primitive())
+
+        finally:
+            shutil.rmtree(temp_root)
 
     def __import_maps(self, cache_path, src_map_list, map_info):
         importing_map_path = os.path.join(self.__import_path, map_info['file'])
@@ -73,15 +149,45 @@ class MapImporter(object):
             if not os.path.isdir(converted_folder):
                 os.mkdir(converted_folder)
 
-            convert_map(map_info['city_id'], map_info['file'], map_info['timestamp'], map_folder, converted_folder,
-                        self.__log, self.__geoname_provider)
+            container = convert_map(map_info['city_id'], map_info['file'], map_info['timestamp'], map_folder,
+                                    converted_folder, self.__log, self.__geoname_provider, self.__options,
+                                    self.__get_package_path(importing_map_path))
 
-            zip_folder(converted_folder, importing_map_path)
-            map_info['size'] = os.path.getsize(importing_map_path)
+            self.__pack_map(converted_folder, importing_map_path, map_info)
+            self.__metadata_cache.put(importing_map_path, container.meta.to_primitive())
 
         finally:
             shutil.rmtree(temp_root)
 
+    def __pack_map(self, converted_folder, importing_map_path, map_info):
+        manifest = write_package_manifest(converted_folder, map_info['timestamp'])
+        previous_manifest = read_package_manifest(importing_map_path)
+
+        zip_folder(converted_folder, importing_map_path)
+        map_info['size'] = os.path.getsize(importing_map_path)
+
+        if self.__text_dictionary is not None:
+            write_dictionary_package(
+                converted_folder,
+                os.path.splitext(importing_map_path)[0] + '.' + DICTIONARY_PACKAGE_EXTENSION,
+                self.__text_dictionary)
+
+        if self.__options.lite_packages:
+            lite, resources = write_split_packages(self.__import_path, importing_map_path, converted_folder,
+                                                    manifest)
+            if lite is not None:
+                map_info['lite'] = lite
+                map_info['resources'] = resources
+
+        if self.__options.delta_depth > 0:
+            map_info['deltas'] = update_delta_packages(self.__deltas_path, importing_map_path, converted_folder,
+                                                       manifest, previous_manifest, self.__options.delta_depth)
+
+    def __get_package_path(self, importing_map_path):
+        if not self.__options.sqlite_package:
+            return None
+        return os.path.splitext(importing_map_path)[0] + '.sqlite'
+
     def __move_map_files(self, src_path, dst_path):
         for file_name in os.listdir(src_path):
             src = os.path.join(src_path, file_name)
@@ -1,13 +1,13 @@
 import os
 import shutil
 import uuid
-import zipfile
 from datetime import date, datetime, timedelta
 from os import listdir
 from os.path import isfile, join
 
 from pmetro.file_utils import unzip_file, find_file_by_extension
 from pmetro.ini_files import deserialize_ini, get_ini_attr
+from pmetro.zip_writer import write_zip
 
 
 class MapIndexer(object):
@@ -78,8 +78,4 @@ class MapIndexer(object):
         if isfile(zip_file):
             os.remove(zip_file)
 
-        zf = zipfile.ZipFile(zip_file, mode='w')
-        try:
-            zf.write(pmz_file, pmz_file_name)
-        finally:
-            zf.close()
+        write_zip(zip_file, [(pmz_file_name, pmz_file)])
@@ -0,0 +1,106 @@
+import codecs
+import hashlib
+import json
+import os
+
+from pmetro.serialization import as_json, OUTPUT_PROFILE_PRETTY
+from publishing.snapshots import SNAPSHOTS_FOLDER, link_file
+
+MANIFEST_FILE = 'manifest.json'
+INTERNAL_FILE_SUFFIXES = ('.cache.json', '.tmp')
+
+
+class PublishingManifest(object):
+    def __init__(self, publishing_path, previous_path=None):
+        self.publishing_path = publishing_path
+        self.manifest_path = os.path.join(publishing_path, MANIFEST_FILE)
+        self.files = load_manifest(publishing_path)
+        self.previous_path = previous_path
+        self.previous_files = load_manifest(previous_path) if previous_path is not None else dict()
+
+    def write_json(self, obj, path, profile=OUTPUT_PROFILE_PRETTY):
+        data = as_json(obj, profile).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self.get_hash(path) == digest:
+            return False
+
+        name = self.__get_name(path)
+        previous = self.previous_files.get(name)
+        if previous is not None and previous['sha256'] == digest and not os.path.exists(path):
+            previous_file = os.path.join(self.previous_path, name)
+            link_file(previous_file, path)
+            self.__update(path, digest)
+            if previous.get('gzip') is False:
+                self.files[name]['gzip'] = False
+            elif previous.get('gzip') and os.path.isfile(previous_file + '.gz'):
+                link_file(previous_file + '.gz', path + '.gz')
+                self.files[name]['gzip'] = True
+            return True
+
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        self.__update(path, digest)
+        return True
+
+    def get_hash(self, path):
+        if not os.path.isfile(path):
+            return None
+        name = self.__get_name(path)
+        stat = os.stat(path)
+        entry = self.files.get(name)
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['sha256']
+        previous = self.previous_files.get(name)
+        if previous is not None and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime_ns:
+            return self.__update(path, previous['sha256'])
+        return self.__update(path, get_file_hash(path))
+
+    def refresh(self):
+        names = set()
+        for root, dirs, files in os.walk(self.publishing_path):
+            if root == self.publishing_path:
+                dirs[:] = [d for d in dirs if d != SNAPSHOTS_FOLDER]
+            for file_name in files:
+                if file_name == MANIFEST_FILE or file_name.endswith(INTERNAL_FILE_SUFFIXES + ('.gz',)):
+                    continue
+                file_path = os.path.join(root, file_name)
+                self.get_hash(file_path)
+                names.add(self.__get_name(file_path))
+
+        for name in set(self.files) - names:
+            del self.files[name]
+
+    def save(self):
+        data = json.dumps({'files': self.files}, ensure_ascii=False, indent=4, sort_keys=True).encode('utf-8')
+        if os.path.isfile(self.manifest_path):
+            with open(self.manifest_path, 'rb') as f:
+                if f.read() == data:
+                    return
+        with open(self.manifest_path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def __update(self, path, digest):
+        stat = os.stat(path)
+        self.files[self.__get_name(path)] = {'sha256': digest, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        return digest
+
+    def __get_name(self, path):
+        return os.path.relpath(path, self.publishing_path).replace('\\', '/')
+
+
+def load_manifest(publishing_path):
+    manifest_path = os.path.join(publishing_path, MANIFEST_FILE)
+    if not os.path.isfile(manifest_path):
+        return dict()
+    with codecs.open(manifest_path, 'r', 'utf-8') as f:
+        return json.load(f)['files']
+
+
+def get_file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,95 @@
+import codecs
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+METADATA_CACHE_FILE = 'metadata.cache.json'
+METADATA_CACHE_VERSION = 1
+DEFAULT_READ_WORKERS = 8
+
+
+class MapMetadataCache(object):
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.entries = dict()
+        self.is_changed = False
+        if os.path.isfile(cache_path):
+            with codecs.open(cache_path, 'r', 'utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == METADATA_CACHE_VERSION:
+                self.entries = data['maps']
+
+    def get(self, map_path):
+        entry = self.entries.get(os.path.basename(map_path))
+        if entry is None:
+            return None
+        stat = os.stat(map_path)
+        if entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime_ns:
+            return None
+        return entry['meta']
+
+    def put(self, map_path, meta):
+        stat = os.stat(map_path)
+        self.entries[os.path.basename(map_path)] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'meta': get_index_metadata(meta)
+        }
+        self.is_changed = True
+
+    def retain(self, file_names):
+        for file_name in set(self.entries) - set(file_names):
+            del self.entries[file_name]
+            self.is_changed = True
+
+    def save(self):
+        if not self.is_changed:
+            return
+        tmp_path = self.cache_path + '.tmp'
+        with codecs.open(tmp_path, 'w', 'utf-8') as f:
+            json.dump({'version': METADATA_CACHE_VERSION, 'maps': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+        self.is_changed = False
+
+
+def get_index_metadata(meta):
+    return {
+        'map_id': meta['map_id'],
+        'city_id': meta['city_id'],
+        'timestamp': meta['timestamp'],
+        'transports': [{'type': transport['type']} for transport in meta['transports']],
+        'latitude': meta['latitude'],
+        'longitude': meta['longitude']
+    }
+
+
+def load_maps_metadata(maps_path, map_files, cache, fallback_cache=None, workers=DEFAULT_READ_WORKERS):
+    metadata = dict()
+    missed = []
+    for map_file in map_files:
+        map_path = os.path.join(maps_path, map_file)
+        meta = cache.get(map_path)
+        if meta is None and fallback_cache is not None:
+            meta = fallback_cache.get(map_path)
+            if meta is not None:
+                cache.put(map_path, meta)
+        if meta is None:
+            missed.append(map_path)
+        else:
+            metadata[map_file] = meta
+
+    if any(missed):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for map_path, meta in zip(missed, executor.map(read_map_metadata, missed)):
+                cache.put(map_path, meta)
+                metadata[os.path.basename(map_path)] = cache.get(map_path)
+
+    cache.retain(map_files)
+    cache.save()
+    return metadata
+
+
+def read_map_metadata(map_path):
+    with zipfile.ZipFile(map_path, 'r') as zip_file:
+        return json.loads(codecs.decode(zip_file.read('index.json'), 'utf-8'))
@@ -0,0 +1,181 @@
+import codecs
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+from pmetro.file_utils import list_folder_files
+from pmetro.zip_writer import write_zip
+from publishing.manifest import get_file_hash
+
+PACKAGE_MANIFEST = 'manifest.json'
+DELTA_MANIFEST = 'delta.json'
+DELTAS_FOLDER = 'deltas'
+DELTAS_HISTORY = 'history.json'
+DEFAULT_DELTA_DEPTH = 3
+LITE_FOLDER = 'lite'
+RESOURCES_FOLDER = 'resources'
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+
+def write_package_manifest(package_folder, version):
+    files = dict()
+    for name in list_folder_files(package_folder):
+        if name != PACKAGE_MANIFEST:
+            files[name] = get_file_hash(os.path.join(package_folder, name))
+
+    manifest = {'version': version, 'files': files}
+    with codecs.open(os.path.join(package_folder, PACKAGE_MANIFEST), 'w', 'utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4, sort_keys=True)
+    return manifest
+
+
+def update_package_manifest(members):
+    manifest_data = dict(members).get(PACKAGE_MANIFEST)
+    if manifest_data is None:
+        return members
+
+    files = dict((name, hashlib.sha256(data).hexdigest()) for name, data in members if name != PACKAGE_MANIFEST)
+    manifest_data = __encode_manifest(
+        {'version': json.loads(codecs.decode(manifest_data, 'utf-8'))['version'], 'files': files})
+    return [(name, manifest_data if name == PACKAGE_MANIFEST else data) for name, data in members]
+
+
+def read_package_manifest(package_path):
+    if not os.path.isfile(package_path):
+        return None
+    # noinspection PyBroadException
+    try:
+        with zipfile.ZipFile(package_path, 'r') as zf:
+            return json.loads(codecs.decode(zf.read(PACKAGE_MANIFEST), 'utf-8'))
+    except:
+        return None
+
+
+def update_delta_packages(deltas_path, package_path, package_folder, manifest, previous_manifest,
+                          depth=DEFAULT_DELTA_DEPTH):
+    map_name = os.path.splitext(os.path.basename(package_path))[0]
+    map_deltas_path = os.path.join(deltas_path, map_name)
+    if not os.path.isdir(map_deltas_path):
+        os.makedirs(map_deltas_path)
+
+    history_path = os.path.join(map_deltas_path, DELTAS_HISTORY)
+    history = __load_history(history_path)
+    if previous_manifest is not None and previous_manifest['version'] not in [m['version'] for m in history]:
+        history.append(previous_manifest)
+    history = [m for m in history if m['version'] != manifest['version']][-depth:]
+
+    package_size = os.path.getsize(package_path)
+    deltas = []
+    delta_files = set()
+    for old_manifest in history:
+        delta_file = '{0}.zip'.format(int(old_manifest['version']))
+        delta_path = os.path.join(map_deltas_path, delta_file)
+        __write_delta_package(delta_path, package_folder, old_manifest, manifest)
+        delta_size = os.path.getsize(delta_path)
+        if delta_size >= package_size:
+            os.remove(delta_path)
+            continue
+        delta_files.add(delta_file)
+        deltas.append({
+            'timestamp': old_manifest['version'],
+            'file': '/'.join([DELTAS_FOLDER, map_name, delta_file]),
+            'size': delta_size
+        })
+
+    for file_name in os.listdir(map_deltas_path):
+        if file_name != DELTAS_HISTORY and file_name not in delta_files:
+            os.remove(os.path.join(map_deltas_path, file_name))
+
+    with codecs.open(history_path + '.tmp', 'w', 'utf-8') as f:
+        json.dump(history, f, ensure_ascii=False)
+    os.replace(history_path + '.tmp', history_path)
+    return deltas
+
+
+def write_split_packages(root_path, package_path, package_folder, manifest):
+    members = [m for m in list_folder_files(package_folder) if m != PACKAGE_MANIFEST]
+    raster_members = set(m for m in members if m.lower().endswith(RASTER_EXTENSIONS))
+    if not any(raster_members):
+        for folder in (LITE_FOLDER, RESOURCES_FOLDER):
+            split_path = os.path.join(root_path, folder, os.path.basename(package_path))
+            if os.path.isfile(split_path):
+                os.remove(split_path)
+        return None, None
+
+    lite_members = [m for m in members if m not in raster_members]
+    return (
+        __write_split_package(root_path, LITE_FOLDER, package_path, package_folder, lite_members, manifest),
+        __write_split_package(root_path, RESOURCES_FOLDER, package_path, package_folder, sorted(raster_members),
+                              manifest))
+
+
+def remove_obsolete_packages(folder_path, package_files):
+    if not os.path.isdir(folder_path):
+        return
+    map_names = set(os.path.splitext(f)[0] for f in package_files)
+    for name in os.listdir(folder_path):
+        path = os.path.join(folder_path, name)
+        if os.path.isdir(path):
+            if name not in map_names:
+                shutil.rmtree(path)
+        elif os.path.splitext(name)[0] not in map_names:
+            os.remove(path)
+
+
+def create_delta(old_manifest, new_manifest):
+    old_files = old_manifest['files']
+    new_files = new_manifest['files']
+    return {
+        'from': old_manifest['version'],
+        'to': new_manifest['version'],
+        'changed': sorted(name for name in new_files if old_files.get(name) != new_files[name]),
+        'removed': sorted(set(old_files) - set(new_files))
+    }
+
+
+def __write_delta_package(delta_path, package_folder, old_manifest, new_manifest):
+    delta = create_delta(old_manifest, new_manifest)
+    members = [(name, os.path.join(package_folder, name)) for name in delta['changed'] + [PACKAGE_MANIFEST]]
+    members.append((DELTA_MANIFEST, json.dumps(delta, ensure_ascii=False, indent=4).encode('utf-8')))
+    write_zip(delta_path + '.tmp', members)
+
+    if os.path.isfile(delta_path) and filecmp.cmp(delta_path + '.tmp', delta_path, shallow=False):
+        os.remove(delta_path + '.tmp')
+        return
+    os.replace(delta_path + '.tmp', delta_path)
+
+
+def __write_split_package(root_path, folder, package_path, package_folder, member_names, manifest):
+    folder_path = os.path.join(root_path, folder)
+    if not os.path.isdir(folder_path):
+        os.mkdir(folder_path)
+    file_name = os.path.basename(package_path)
+    split_path = os.path.join(folder_path, file_name)
+
+    split_manifest = {
+        'version': manifest['version'],
+        'files': dict((name, manifest['files'][name]) for name in member_names)
+    }
+    members = [(name, os.path.join(package_folder, name)) for name in member_names]
+    members.append((PACKAGE_MANIFEST, __encode_manifest(split_manifest)))
+    write_zip(split_path + '.tmp', members)
+
+    if os.path.isfile(split_path) and filecmp.cmp(split_path + '.tmp', split_path, shallow=False):
+        os.remove(split_path + '.tmp')
+    else:
+        os.replace(split_path + '.tmp', split_path)
+    return {'file': folder + '/' + file_name, 'size': os.path.getsize(split_path)}
+
+
+def __encode_manifest(manifest):
+    return json.dumps(manifest, ensure_ascii=False, indent=4, sort_keys=True).encode('utf-8')
+
+
+def __load_history(history_path):
+    if not os.path.isfile(history_path):
+        return []
+    with codecs.open(history_path, 'r', 'utf-8') as f:
+        return json.load(f)
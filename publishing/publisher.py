@@ -1,4 +1,3 @@
-import zipfile
 import codecs
 import json
 import os
@@ -6,11 +5,29 @@ import shutil
 
 from globalization.settings import LANGUAGE_SET
 from pmetro.file_utils import get_file_ext
-from pmetro.serialization import write_as_json_file
+from pmetro.log import EmptyLog
+from pmetro.serialization import write_as_json_file, OUTPUT_PROFILE_PRETTY, OUTPUT_PROFILE_COMPACT
+from publishing.catalog import load_catalog
+from publishing.compression import compress_published_files
+from publishing.dictionary import DICTIONARY_FOLDER, DICTIONARY_EXTENSION, DICTIONARY_PACKAGE_EXTENSION
+from publishing.feeds import update_catalog_feeds, DEFAULT_FEED_DEPTH
+from publishing.manifest import PublishingManifest
+from publishing.metadata import MapMetadataCache, load_maps_metadata, METADATA_CACHE_FILE
+from publishing.packages import DELTAS_FOLDER, LITE_FOLDER, RESOURCES_FOLDER
+from publishing.snapshots import create_snapshot, activate_snapshot, remove_old_snapshots, link_file, \
+    DEFAULT_KEEP_SNAPSHOTS
+from publishing.texts import build_shared_text_table, load_shared_text_version
+
+CITIES_CACHE_FILE = 'cities.cache.json'
+PUBLISHING_CACHE_FOLDER = 'publishing'
+CATALOG_SHARDS_FOLDER = 'catalog'
+CATALOG_SHARDS_INDEX = 'index.json'
+UNKNOWN_COUNTRY_ISO = 'unknown'
 
 
 class MapIndexEntity(object):
-    def __init__(self, uid, city_id, file, size, timestamp, transports, latitude, longitude):
+    def __init__(self, uid, city_id, file, size, timestamp, transports, latitude, longitude, deltas=None, lite=None,
+                 resources=None):
         self.uid = uid
         self.city_id = city_id
         self.file = file
@@ -19,15 +36,133 @@ class MapIndexEntity(object):
         self.transports = transports
         self.latitude = latitude
         self.longitude = longitude
+        if deltas is not None:
+            self.deltas = deltas
+        if lite is not None:
+            self.lite = lite
+        if resources is not None:
+            self.resources = resources
+
+
+class PublishOptions(object):
+    def __init__(self, shared_texts=False, profile=OUTPUT_PROFILE_PRETTY, catalog_feeds=False,
+                 feed_depth=DEFAULT_FEED_DEPTH, snapshots=False, keep_snapshots=DEFAULT_KEEP_SNAPSHOTS,
+                 gzip_static=False, catalog_shards=False, cache_path=None):
+        self.shared_texts = shared_texts
+        self.profile = profile
+        self.catalog_feeds = catalog_feeds
+        self.feed_depth = feed_depth
+        self.snapshots = snapshots
+        self.keep_snapshots = keep_snapshots
+        self.gzip_static = gzip_static
+        self.catalog_shards = catalog_shards
+        self.cache_path = cache_path
+
+
+def publish_maps(maps_path, publishing_path, geonames_provider, logger=None, options=None):
+    if logger is None:
+        logger = EmptyLog()
+    if options is None:
+        options = PublishOptions()
+
+    if options.snapshots:
+        __publish_snapshot(maps_path, publishing_path, geonames_provider, logger, options)
+        return
+
+    manifest = PublishingManifest(publishing_path)
+    if options.shared_texts:
+        __publish_maps_with_shared_texts(maps_path, publishing_path, logger, options.profile, manifest)
+    else:
+        __publish_maps(maps_path, publishing_path)
+        __publish_folder(maps_path, publishing_path, DELTAS_FOLDER, 'zip', shutil.copy2)
+    __publish_maps(maps_path, publishing_path, 'sqlite')
+    __publish_maps(maps_path, publishing_path, DICTIONARY_PACKAGE_EXTENSION)
+    __publish_folder(maps_path, publishing_path, LITE_FOLDER, 'zip', shutil.copy2)
+    __publish_folder(maps_path, publishing_path, RESOURCES_FOLDER, 'zip', shutil.copy2)
+    __publish_folder(maps_path, publishing_path, DICTIONARY_FOLDER, DICTIONARY_EXTENSION, shutil.copy2)
+    __publish_index(maps_path, publishing_path, geonames_provider, logger, options, manifest)
+
+
+def __publish_snapshot(maps_path, publishing_path, geonames_provider, logger, options):
+    snapshot_path, previous_path = create_snapshot(publishing_path)
+    manifest = PublishingManifest(snapshot_path, previous_path)
+    try:
+        if options.shared_texts:
+            __publish_maps_with_shared_texts(maps_path, snapshot_path, logger, options.profile, manifest,
+                                             previous_path)
+        else:
+            __link_maps(maps_path, snapshot_path)
+            __publish_folder(maps_path, snapshot_path, DELTAS_FOLDER, 'zip', link_file)
+        __link_maps(maps_path, snapshot_path, 'sqlite')
+        __link_maps(maps_path, snapshot_path, DICTIONARY_PACKAGE_EXTENSION)
+        __publish_folder(maps_path, snapshot_path, LITE_FOLDER, 'zip', link_file)
+        __publish_folder(maps_path, snapshot_path, RESOURCES_FOLDER, 'zip', link_file)
+        __publish_folder(maps_path, snapshot_path, DICTIONARY_FOLDER, DICTIONARY_EXTENSION, link_file)
+        __publish_index(maps_path, snapshot_path, geonames_provider, logger, options, manifest)
+    except:
+        shutil.rmtree(snapshot_path)
+        raise
+
+    activate_snapshot(publishing_path, snapshot_path)
+    remove_old_snapshots(publishing_path, options.keep_snapshots)
+    logger.info('Published snapshot %s' % os.path.basename(snapshot_path))
+
+
+def __publish_index(maps_path, publishing_path, geonames_provider, logger, options, manifest):
+    __rebuild_cities_index(maps_path, publishing_path, __get_cache_path(maps_path, options), geonames_provider,
+                           options.profile, manifest, options.feed_depth if options.catalog_feeds else None,
+                           options.catalog_shards)
+    manifest.refresh()
+    if options.gzip_static:
+        compress_published_files(publishing_path, manifest, logger)
+    manifest.save()
 
 
-def publish_maps(maps_path, publishing_path, geonames_provider):
-    __publish_maps(maps_path, publishing_path)
-    __rebuild_cities_index(publishing_path, geonames_provider)
+def __get_cache_path(maps_path, options):
+    cache_path = options.cache_path if options.cache_path is not None else os.path.join(
+        maps_path, PUBLISHING_CACHE_FOLDER)
+    if not os.path.isdir(cache_path):
+        os.makedirs(cache_path)
+    return cache_path
 
 
-def __publish_maps(maps_path, publishing_path):
-    for file_name in [f for f in os.listdir(maps_path) if get_file_ext(os.path.join(maps_path, f)) == 'zip']:
+def __publish_maps_with_shared_texts(maps_path, publishing_path, logger, profile, manifest, previous_path=None):
+    reference_path = previous_path if previous_path is not None else publishing_path
+    shared_table = build_shared_text_table(maps_path, profile)
+    is_table_changed = shared_table.version != load_shared_text_version(reference_path)
+    shared_size = shared_table.save(publishing_path, manifest)
+
+    original_size = 0
+    overlay_size = 0
+    for file_name in __find_map_files(maps_path):
+        source_file = os.path.join(maps_path, file_name)
+        destination_file = os.path.join(publishing_path, file_name)
+        reference_file = os.path.join(reference_path, file_name)
+
+        if not is_table_changed and os.path.isfile(reference_file) and os.path.getmtime(
+                source_file) == os.path.getmtime(reference_file):
+            if reference_file != destination_file:
+                link_file(reference_file, destination_file)
+            continue
+
+        map_original_size, map_overlay_size = shared_table.rewrite_map(source_file, destination_file)
+        original_size += map_original_size
+        overlay_size += map_overlay_size
+
+    shared_table.remove_obsolete(publishing_path)
+
+    if original_size > 0:
+        logger.info('Shared texts %s: %s strings, text bytes %s -> %s + %s shared, saved %s' % (
+            shared_table.version,
+            sum(len(texts) for texts in shared_table.locales.values()),
+            original_size,
+            overlay_size,
+            shared_size,
+            original_size - overlay_size - shared_size))
+
+
+def __publish_maps(maps_path, publishing_path, extension='zip'):
+    for file_name in __find_map_files(maps_path, extension):
         source_file = os.path.join(maps_path, file_name)
         destination_file = os.path.join(publishing_path, file_name)
 
@@ -40,40 +175,143 @@ def __publish_maps(maps_path, publishing_path):
         shutil.copy2(source_file, publishing_path)
 
 
-def __rebuild_cities_index(publishing_path, geonames_provider):
+def __link_maps(maps_path, publishing_path, extension='zip'):
+    for file_name in __find_map_files(maps_path, extension):
+        link_file(os.path.join(maps_path, file_name), os.path.join(publishing_path, file_name))
+
+
+def __publish_folder(maps_path, publishing_path, folder_name, extension, copy_function):
+    source_path = os.path.join(maps_path, folder_name)
+    published_path = os.path.join(publishing_path, folder_name)
+    if not os.path.isdir(source_path) and not os.path.isdir(published_path):
+        return
+
+    published_files = set()
+    for root, dirs, files in os.walk(source_path):
+        for file_name in files:
+            if get_file_ext(file_name) != extension:
+                continue
+            source_file = os.path.join(root, file_name)
+            destination_file = os.path.join(published_path, os.path.relpath(source_file, source_path))
+            published_files.add(destination_file)
+
+            if os.path.isfile(destination_file) and os.path.getsize(source_file) == os.path.getsize(
+                    destination_file) and os.path.getmtime(source_file) == os.path.getmtime(destination_file):
+                continue
+
+            if not os.path.isdir(os.path.dirname(destination_file)):
+                os.makedirs(os.path.dirname(destination_file))
+            if os.path.isfile(destination_file):
+                os.remove(destination_file)
+            copy_function(source_file, destination_file)
+
+    for root, dirs, files in os.walk(published_path, topdown=False):
+        for file_name in files:
+            if os.path.join(root, file_name) not in published_files:
+                os.remove(os.path.join(root, file_name))
+        if root != published_path and not any(os.listdir(root)):
+            os.rmdir(root)
+
+
+def __find_map_files(maps_path, extension='zip'):
+    return [f for f in os.listdir(maps_path) if get_file_ext(os.path.join(maps_path, f)) == extension]
+
+
+def __rebuild_cities_index(maps_path, publishing_path, cache_path, geonames_provider, profile, manifest,
+                           feed_depth=None, catalog_shards=False):
     locales_path = os.path.join(publishing_path, 'locales')
     if not os.path.isdir(locales_path):
         os.mkdir(locales_path)
 
-    maps_index = sorted(__create_index(publishing_path), key=lambda k: k.uid)
-    localizations = __create_localized_cities_list(geonames_provider, (m.city_id for m in maps_index))
+    maps_index = sorted(__create_index(maps_path, publishing_path, cache_path), key=lambda k: k.uid)
+    localizations = __load_localized_cities_list(cache_path, geonames_provider, [m.city_id for m in maps_index])
 
-    write_as_json_file(maps_index, os.path.join(publishing_path, 'index.json'))
-    write_as_json_file(localizations, os.path.join(publishing_path, 'locales.json'))
-    write_as_json_file(dict(timestamp=max(maps_index, key=lambda x: x.timestamp).timestamp),
-                       os.path.join(publishing_path, 'timestamp.json'))
+    manifest.write_json(maps_index, os.path.join(publishing_path, 'index.json'), profile)
+    manifest.write_json(localizations, os.path.join(publishing_path, 'locales.json'), profile)
+
+    timestamp = dict(timestamp=max(maps_index, key=lambda x: x.timestamp).timestamp)
+    if feed_depth is not None:
+        timestamp['version'] = update_catalog_feeds(publishing_path, cache_path, maps_index, manifest, profile,
+                                                          feed_depth)
+    manifest.write_json(timestamp, os.path.join(publishing_path, 'timestamp.json'), profile)
+
+    if catalog_shards:
+        __write_catalog_shards(publishing_path, maps_index, localizations, profile, manifest)
 
     for locale in localizations['locales']:
-        write_as_json_file(localizations['locales'][locale],
-                           os.path.join(locales_path, 'cities.{0}.json'.format(locale)))
+        manifest.write_json(localizations['locales'][locale],
+                            os.path.join(locales_path, 'cities.{0}.json'.format(locale)), profile)
 
-    write_as_json_file(localizations['locales'][localizations['default_locale']],
-                       os.path.join(locales_path, 'cities.default.json'))
+    manifest.write_json(localizations['locales'][localizations['default_locale']],
+                        os.path.join(locales_path, 'cities.default.json'), profile)
 
-    write_as_json_file(
+    manifest.write_json(
         [l for l in localizations['locales']],
-        os.path.join(locales_path, 'locales.json')
+        os.path.join(locales_path, 'locales.json'),
+        profile
     )
 
 
+def __write_catalog_shards(publishing_path, maps_index, localizations, profile, manifest):
+    shards_path = os.path.join(publishing_path, CATALOG_SHARDS_FOLDER)
+    if not os.path.isdir(shards_path):
+        os.mkdir(shards_path)
+
+    city_countries = dict((city[0], city[3]) for city in localizations['locales'][localizations['default_locale']])
+    shards = dict()
+    for map_index in maps_index:
+        iso = city_countries.get(map_index.city_id) or UNKNOWN_COUNTRY_ISO
+        shards.setdefault(iso.lower(), []).append(map_index)
+
+    countries = []
+    for iso in sorted(shards):
+        shard_file = '{0}.json'.format(iso)
+        shard_path = os.path.join(shards_path, shard_file)
+        shard_timestamp = max(m.timestamp for m in shards[iso])
+        manifest.write_json(dict(timestamp=shard_timestamp, maps=shards[iso]), shard_path, profile)
+        countries.append(dict(
+            iso=iso,
+            file=CATALOG_SHARDS_FOLDER + '/' + shard_file,
+            timestamp=shard_timestamp,
+            maps=len(shards[iso]),
+            size=os.path.getsize(shard_path)))
+
+    manifest.write_json(
+        dict(timestamp=max(c['timestamp'] for c in countries), countries=countries),
+        os.path.join(shards_path, CATALOG_SHARDS_INDEX),
+        profile)
+
+    shard_files = set(c['file'].split('/')[-1] for c in countries)
+    for file_name in os.listdir(shards_path):
+        source_name = file_name[:-3] if file_name.endswith('.gz') else file_name
+        if source_name != CATALOG_SHARDS_INDEX and source_name not in shard_files:
+            os.remove(os.path.join(shards_path, file_name))
+
+
+def __load_localized_cities_list(cache_path, geonames_provider, city_ids):
+    key = {'city_ids': sorted(set(city_ids)), 'languages': sorted(LANGUAGE_SET),
+           'geonames': geonames_provider.get_database_stamp()}
+    cache_file = os.path.join(cache_path, CITIES_CACHE_FILE)
+    if os.path.isfile(cache_file):
+        with codecs.open(cache_file, 'r', 'utf-8') as f:
+            cache = json.load(f)
+        if cache['key'] == key:
+            return cache['localizations']
+
+    localizations = __create_localized_cities_list(geonames_provider, key['city_ids'])
+    write_as_json_file({'key': key, 'localizations': localizations}, cache_file, OUTPUT_PROFILE_COMPACT)
+    return localizations
+
+
 def __create_localized_cities_list(geonames_provider, city_ids, show_defaults=False):
     cities = geonames_provider.get_cities_info(city_ids)
 
     all_ids = set([c.geoname_id for c in cities] + [c.country_geoname_id for c in cities])
+    all_names = geonames_provider.get_names_for_languages(all_ids, LANGUAGE_SET)
 
     locales = dict()
-    for language_code in LANGUAGE_SET:
-        names = geonames_provider.get_names_for_language(all_ids, language_code)
+    for language_code in sorted(LANGUAGE_SET):
+        names = all_names[language_code]
         locale = []
         for city_info in cities:
 
@@ -111,10 +349,23 @@ def __create_localized_cities_list(geonames_provider, city_ids, show_defaults=Fa
     return dict(locales=locales, default_locale='en')
 
 
-def __create_index(maps_path):
-    for map_file in [f for f in os.listdir(maps_path) if get_file_ext(os.path.join(maps_path, f)) == 'zip']:
-        full_map_file_path = os.path.join(maps_path, map_file)
-        meta = __get_map_metadata(full_map_file_path)
+def __create_index(maps_path, publishing_path, cache_path):
+    map_files = __find_map_files(publishing_path)
+    catalog = load_catalog(os.path.join(maps_path, 'index.json'))
+    has_deltas = os.path.isdir(os.path.join(publishing_path, DELTAS_FOLDER))
+    has_lite = os.path.isdir(os.path.join(publishing_path, LITE_FOLDER))
+    metadata = load_maps_metadata(
+        publishing_path,
+        map_files,
+        MapMetadataCache(os.path.join(cache_path, METADATA_CACHE_FILE)),
+        MapMetadataCache(os.path.join(maps_path, METADATA_CACHE_FILE)))
+
+    for map_file in map_files:
+        full_map_file_path = os.path.join(publishing_path, map_file)
+        meta = metadata[map_file]
+        map_info = catalog.find_by_file(map_file)
+        if map_info is None:
+            map_info = dict()
         yield MapIndexEntity(
             meta['map_id'],
             meta['city_id'],
@@ -123,11 +374,8 @@ def __create_index(maps_path):
             meta['timestamp'],
             sorted([transport['type'] for transport in meta['transports']]),
             meta['latitude'],
-            meta['longitude']
+            meta['longitude'],
+            map_info.get('deltas') if has_deltas else None,
+            map_info.get('lite') if has_lite else None,
+            map_info.get('resources') if has_lite else None
         )
-
-
-def __get_map_metadata(map_path):
-    with zipfile.ZipFile(map_path, 'r') as zip_file:
-        index_json = codecs.decode(zip_file.read('index.json'), 'utf-8)')
-        return json.loads(index_json)
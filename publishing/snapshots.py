@@ -0,0 +1,52 @@
+import datetime
+import os
+import shutil
+
+SNAPSHOTS_FOLDER = 'snapshots'
+CURRENT_LINK = 'current'
+DEFAULT_KEEP_SNAPSHOTS = 3
+
+
+def get_current_snapshot(publishing_path):
+    current_path = os.path.join(publishing_path, CURRENT_LINK)
+    if not os.path.islink(current_path):
+        return None
+    snapshot_path = os.path.join(publishing_path, os.readlink(current_path))
+    return snapshot_path if os.path.isdir(snapshot_path) else None
+
+
+def create_snapshot(publishing_path):
+    snapshots_path = os.path.join(publishing_path, SNAPSHOTS_FOLDER)
+    if not os.path.isdir(snapshots_path):
+        os.mkdir(snapshots_path)
+
+    snapshot_path = os.path.join(snapshots_path, datetime.datetime.now().strftime('%Y%m%d.%H%M%S.%f'))
+    os.mkdir(snapshot_path)
+    return snapshot_path, get_current_snapshot(publishing_path)
+
+
+def link_file(src_file, dst_file):
+    try:
+        os.link(src_file, dst_file)
+    except OSError:
+        shutil.copy2(src_file, dst_file)
+
+
+def activate_snapshot(publishing_path, snapshot_path):
+    current_path = os.path.join(publishing_path, CURRENT_LINK)
+    tmp_link = current_path + '.tmp'
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(snapshot_path, publishing_path), tmp_link)
+    os.replace(tmp_link, current_path)
+
+
+def remove_old_snapshots(publishing_path, keep=DEFAULT_KEEP_SNAPSHOTS):
+    snapshots_path = os.path.join(publishing_path, SNAPSHOTS_FOLDER)
+    current_path = get_current_snapshot(publishing_path)
+    snapshots = sorted(os.listdir(snapshots_path), reverse=True)
+    for snapshot in snapshots[max(keep, 1):]:
+        snapshot_path = os.path.join(snapshots_path, snapshot)
+        if current_path is not None and os.path.samefile(snapshot_path, current_path):
+            continue
+        shutil.rmtree(snapshot_path)
@@ -0,0 +1,125 @@
+import codecs
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+from pmetro.file_utils import get_file_ext
+from pmetro.serialization import as_json, OUTPUT_PROFILE_PRETTY
+from pmetro.zip_writer import write_zip
+from publishing.packages import update_package_manifest
+
+SHARED_TEXTS_FOLDER = 'texts'
+SHARED_TEXTS_INDEX = 'shared.json'
+
+
+class SharedTextTable(object):
+    def __init__(self, locales, profile=OUTPUT_PROFILE_PRETTY):
+        self.locales = locales
+        self.profile = profile
+        self.indexes = dict(
+            (locale, dict((text, text_id) for text_id, text in enumerate(texts))) for locale, texts in locales.items())
+        self.version = hashlib.sha1(
+            json.dumps(locales, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def get_file_name(self, locale):
+        return 'shared.{0}.{1}.json'.format(self.version, locale)
+
+    def create_overlay(self, locale, texts):
+        index = self.indexes.get(locale, dict())
+        refs = dict()
+        local_texts = dict()
+        for text_id, text in texts.items():
+            if text in index:
+                refs[text_id] = index[text]
+            else:
+                local_texts[text_id] = text
+        return {'shared': self.version, 'refs': refs, 'texts': local_texts}
+
+    def save(self, publishing_path, manifest):
+        texts_path = os.path.join(publishing_path, SHARED_TEXTS_FOLDER)
+        if not os.path.isdir(texts_path):
+            os.mkdir(texts_path)
+
+        files = dict()
+        size = 0
+        for locale in sorted(self.locales):
+            file_path = os.path.join(texts_path, self.get_file_name(locale))
+            manifest.write_json(self.locales[locale], file_path, self.profile)
+            files[locale] = SHARED_TEXTS_FOLDER + '/' + self.get_file_name(locale)
+            size += os.path.getsize(file_path)
+
+        manifest.write_json({'version': self.version, 'locales': files},
+                            os.path.join(texts_path, SHARED_TEXTS_INDEX), self.profile)
+        return size
+
+    def remove_obsolete(self, publishing_path):
+        texts_path = os.path.join(publishing_path, SHARED_TEXTS_FOLDER)
+        current_files = set(self.get_file_name(locale) for locale in self.locales)
+        for file_name in os.listdir(texts_path):
+            source_name = file_name[:-3] if file_name.endswith('.gz') else file_name
+            if source_name.startswith('shared.') and source_name != SHARED_TEXTS_INDEX \
+                    and source_name not in current_files:
+                os.remove(os.path.join(texts_path, file_name))
+
+    def rewrite_map(self, src_file, dst_file):
+        tmp_file = dst_file + '.tmp'
+        original_size = 0
+        overlay_size = 0
+        members = []
+        with zipfile.ZipFile(src_file, 'r') as src_zip:
+            text_members = get_map_text_members(src_zip)
+            for info in src_zip.infolist():
+                data = src_zip.read(info)
+                if info.filename in text_members:
+                    texts = json.loads(codecs.decode(data, 'utf-8'))
+                    original_size += len(data)
+                    overlay = self.create_overlay(text_members[info.filename], texts)
+                    data = as_json(overlay, self.profile).encode('utf-8')
+                    overlay_size += len(data)
+                members.append((info.filename, data))
+        write_zip(tmp_file, update_package_manifest(members))
+
+        if os.path.isfile(dst_file):
+            os.remove(dst_file)
+        os.rename(tmp_file, dst_file)
+        shutil.copystat(src_file, dst_file)
+        return original_size, overlay_size
+
+
+def build_shared_text_table(maps_path, profile=OUTPUT_PROFILE_PRETTY, min_maps=2):
+    counters = dict()
+    for map_file in __find_maps(maps_path):
+        with zipfile.ZipFile(map_file, 'r') as zf:
+            for member, locale in get_map_text_members(zf).items():
+                counter = counters.setdefault(locale, dict())
+                for text in set(json.loads(codecs.decode(zf.read(member), 'utf-8')).values()):
+                    counter[text] = counter.get(text, 0) + 1
+
+    locales = dict()
+    for locale, counter in counters.items():
+        shared = [(count, text) for text, count in counter.items() if count >= min_maps]
+        locales[locale] = [text for count, text in sorted(shared, key=lambda x: (-x[0], x[1]))]
+
+    return SharedTextTable(locales, profile)
+
+
+def load_shared_text_version(publishing_path):
+    index_path = os.path.join(publishing_path, SHARED_TEXTS_FOLDER, SHARED_TEXTS_INDEX)
+    if not os.path.isfile(index_path):
+        return None
+    with codecs.open(index_path, 'r', 'utf-8') as f:
+        return json.load(f)['version']
+
+
+def get_map_text_members(zf):
+    meta = json.loads(codecs.decode(zf.read('index.json'), 'utf-8'))
+    members = set(zf.namelist())
+    return dict(('texts/{0}.json'.format(locale), locale) for locale in meta['locales']
+                if 'texts/{0}.json'.format(locale) in members)
+
+
+def __find_maps(maps_path):
+    return sorted(os.path.join(maps_path, f) for f in os.listdir(maps_path)
+                  if get_file_ext(os.path.join(maps_path, f)) == 'zip')
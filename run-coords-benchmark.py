@@ -0,0 +1,48 @@
+# /usr/bin/env python3
+import codecs
+import json
+import os
+import time
+import zipfile
+
+from pmetro.coords_codec import encode_polylines, decode_polylines, encode_polylines_base64
+from pmetro.file_utils import get_file_ext
+from settings import APP_LOG, IMPORT_PATH
+
+
+def load_polylines(maps_path):
+    for map_file in sorted(f for f in os.listdir(maps_path) if get_file_ext(os.path.join(maps_path, f)) == 'zip'):
+        with zipfile.ZipFile(os.path.join(maps_path, map_file)) as zf:
+            for name in zf.namelist():
+                if not name.startswith('schemes/') or not name.endswith('.json'):
+                    continue
+                scheme = json.loads(codecs.decode(zf.read(name), 'utf-8'))
+                for line in scheme['lines']:
+                    if 'points' in line:
+                        continue
+                    yield [[tuple(p) for p in segment[2]] for segment in line['segments']]
+
+
+all_polylines = list(load_polylines(IMPORT_PATH))
+points_count = sum(len(points) for polylines in all_polylines for points in polylines)
+
+json_size = sum(len(json.dumps(polylines, separators=(',', ':'))) for polylines in all_polylines)
+
+start = time.time()
+encoded = [encode_polylines(polylines) for polylines in all_polylines]
+encode_time = time.time() - start
+
+start = time.time()
+for data in encoded:
+    decode_polylines(data)
+decode_time = time.time() - start
+
+binary_size = sum(len(data) for data in encoded)
+base64_size = sum(len(encode_polylines_base64(polylines)) for polylines in all_polylines)
+
+APP_LOG.message('Lines: %s, points: %s' % (len(all_polylines), points_count))
+APP_LOG.message('Compact JSON points: %s bytes' % json_size)
+APP_LOG.message('Varint points: %s bytes (%.1f%%), base64: %s bytes (%.1f%%)' % (
+    binary_size, 100.0 * binary_size / max(json_size, 1), base64_size, 100.0 * base64_size / max(json_size, 1)))
+APP_LOG.message('Encode: %.3f s (%.0f points/s), decode: %.3f s (%.0f points/s)' % (
+    encode_time, points_count / max(encode_time, 1e-9), decode_time, points_count / max(decode_time, 1e-9)))
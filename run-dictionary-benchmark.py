@@ -0,0 +1,48 @@
+# /usr/bin/env python3
+import time
+import zlib
+
+from publishing.dictionary import load_dictionary_samples, train_dictionary, DICTIONARY_LEVEL
+from settings import APP_LOG, IMPORT_PATH
+
+
+def deflate(data):
+    compressor = zlib.compressobj(DICTIONARY_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def inflate(data):
+    return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+def measure_decode(encoded, decode, rounds=5):
+    start = time.time()
+    for _ in range(rounds):
+        for data in encoded:
+            decode(data)
+    return (time.time() - start) / rounds
+
+
+samples = load_dictionary_samples(IMPORT_PATH)
+training_samples = samples[0::2]
+test_samples = samples[1::2]
+
+dictionary = train_dictionary(training_samples)
+
+original_size = sum(len(sample) for sample in test_samples)
+deflated = [deflate(sample) for sample in test_samples]
+compressed = [dictionary.compress(sample) for sample in test_samples]
+deflate_size = sum(len(data) for data in deflated)
+dictionary_size = sum(len(data) for data in compressed)
+
+deflate_time = measure_decode(deflated, inflate)
+dictionary_time = measure_decode(compressed, dictionary.decompress)
+megabytes = original_size / 1048576.0
+
+APP_LOG.message('Samples: %s for training, %s for test (%s bytes), dictionary %s bytes' % (
+    len(training_samples), len(test_samples), original_size, len(dictionary.data)))
+APP_LOG.message('Deflate: %s bytes (%.1f%%), decode %.3f s (%.1f MB/s)' % (
+    deflate_size, 100.0 * deflate_size / max(original_size, 1), deflate_time, megabytes / max(deflate_time, 1e-9)))
+APP_LOG.message('Deflate with dictionary: %s bytes (%.1f%%), decode %.3f s (%.1f MB/s), saved %s bytes' % (
+    dictionary_size, 100.0 * dictionary_size / max(original_size, 1), dictionary_time,
+    megabytes / max(dictionary_time, 1e-9), deflate_size - dictionary_size))
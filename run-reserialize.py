@@ -0,0 +1,17 @@
+# /usr/bin/env python3
+import datetime
+from globalization.provider import GeoNamesProvider
+from publishing.importer import MapImporter
+from settings import TEMP_PATH, IMPORT_PATH, APP_LOG, GEONAMES_DB, CONVERT_OPTIONS, MODEL_CACHE_PATH, \
+    IMPORT_CATALOG_STORE
+
+geonames_provider = GeoNamesProvider(GEONAMES_DB)
+
+APP_LOG.message('')
+APP_LOG.message('Re-serialization started at %s' % (datetime.datetime.today().strftime('%Y-%m-%d %H:%M:%S.%f')))
+
+publication = MapImporter(IMPORT_PATH, TEMP_PATH, APP_LOG, geonames_provider, CONVERT_OPTIONS,
+                          IMPORT_CATALOG_STORE)
+publication.reserialize_maps(MODEL_CACHE_PATH)
+
+APP_LOG.message('Re-serialization ended at %s' % (datetime.datetime.today().strftime('%Y-%m-%d %H:%M:%S.%f')))
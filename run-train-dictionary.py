@@ -0,0 +1,10 @@
+# /usr/bin/env python3
+from publishing.dictionary import load_dictionary_samples, train_dictionary
+from settings import APP_LOG, IMPORT_PATH, TEXT_DICTIONARY_PATH
+
+samples = load_dictionary_samples(IMPORT_PATH)
+dictionary = train_dictionary(samples)
+dictionary.save(TEXT_DICTIONARY_PATH)
+
+APP_LOG.message('Trained text dictionary %s: %s bytes from %s samples (%s bytes)' % (
+    dictionary.version, len(dictionary.data), len(samples), sum(len(sample) for sample in samples)))
@@ -4,7 +4,13 @@ import datetime
 from globalization.builder import build_geonames_database
 from pmetro import ini_files
 from pmetro import pmz_transports
+from pmetro import pmz_texts
+from pmetro.options import ConvertOptions
 from pmetro.log import CompositeLog, LogLevel, ConsoleLog, FileLog
+from pmetro.serialization import TEXT_FORMAT_JSON, OUTPUT_PROFILE_PRETTY
+from pmetro.transliteration import TransliterationEngine
+from publishing.catalog_store import CatalogStore
+from publishing.publisher import PublishOptions
 
 
 def ensure_directories_created(paths):
@@ -18,6 +24,28 @@ FORCE_IMPORT = False
 
 MAPS_SOURCE_URL = 'https://maps.ametro.org/autoupdate/'
 
+SVG_TILE_SIZE = None
+TEXT_FORMAT = TEXT_FORMAT_JSON
+OUTPUT_PROFILE = OUTPUT_PROFILE_PRETTY
+SIZE_REPORT = False
+BINARY_MODEL = False
+COORDS_CODEC = False
+SHARED_TEXTS = False
+MODEL_CACHE = False
+SCHEME_CHUNKS = False
+SQLITE_PACKAGE = False
+CATALOG_STORE = False
+CATALOG_FEEDS = False
+CATALOG_FEED_DEPTH = 10
+PUBLISH_SNAPSHOTS = False
+KEEP_SNAPSHOTS = 3
+GZIP_STATIC = False
+CATALOG_SHARDS = False
+DELTA_PACKAGES = False
+DELTA_DEPTH = 3
+TEXT_DICTIONARY = False
+LITE_PACKAGES = False
+
 base_dir = ''
 
 GEONAMES_PATH = os.path.join(base_dir, 'geonames')
@@ -26,7 +54,13 @@ GEONAMES_DB = os.path.join(GEONAMES_PATH, 'geonames.db')
 PMETRO_PATH = os.path.join(base_dir, 'www/autoupdate')
 MANUAL_PATH = os.path.join(base_dir, 'manual/app')
 CACHE_PATH = os.path.join(base_dir, 'cache')
+TRANSLITERATION_CACHE_DB = os.path.join(CACHE_PATH, 'translit.db')
+MODEL_CACHE_PATH = os.path.join(base_dir, 'models')
+PUBLISHING_CACHE_PATH = os.path.join(CACHE_PATH, 'publishing')
+TEXT_DICTIONARY_PATH = os.path.join(CACHE_PATH, 'text.zdict')
+CACHE_CATALOG_DB = os.path.join(CACHE_PATH, 'index.db')
 IMPORT_PATH = os.path.join(base_dir, 'import')
+IMPORT_CATALOG_DB = os.path.join(IMPORT_PATH, 'index.db')
 PUBLISHING_PATH = os.path.join(base_dir, 'www')
 TEMP_PATH = os.path.join(base_dir, 'tmp')
 LOG_BASE_PATH = os.path.join(base_dir, 'logs')
@@ -42,7 +76,23 @@ APP_LOG = CompositeLog([
     FileLog(file_path=os.path.join(LOG_PATH, 'import.errors.log'), level=LogLevel.Error)
 ])
 
+CONVERT_OPTIONS = ConvertOptions(svg_tile_size=SVG_TILE_SIZE, text_format=TEXT_FORMAT, profile=OUTPUT_PROFILE,
+                                 size_report=SIZE_REPORT, binary_model=BINARY_MODEL, coords_codec=COORDS_CODEC,
+                                 model_cache_path=MODEL_CACHE_PATH if MODEL_CACHE else None,
+                                 scheme_chunks=SCHEME_CHUNKS, sqlite_package=SQLITE_PACKAGE,
+                                 delta_depth=DELTA_DEPTH if DELTA_PACKAGES else 0,
+                                 text_dictionary_path=TEXT_DICTIONARY_PATH if TEXT_DICTIONARY else None,
+                                 lite_packages=LITE_PACKAGES)
+PUBLISH_OPTIONS = PublishOptions(shared_texts=SHARED_TEXTS, profile=OUTPUT_PROFILE, catalog_feeds=CATALOG_FEEDS,
+                                 feed_depth=CATALOG_FEED_DEPTH, snapshots=PUBLISH_SNAPSHOTS,
+                                 keep_snapshots=KEEP_SNAPSHOTS, gzip_static=GZIP_STATIC, catalog_shards=CATALOG_SHARDS,
+                                 cache_path=PUBLISHING_CACHE_PATH)
+
+CACHE_CATALOG_STORE = CatalogStore(CACHE_CATALOG_DB) if CATALOG_STORE else None
+IMPORT_CATALOG_STORE = CatalogStore(IMPORT_CATALOG_DB) if CATALOG_STORE else None
+
 ini_files.LOG = APP_LOG
 pmz_transports.LOG = APP_LOG
+pmz_texts.TRANSLITERATION = TransliterationEngine(cache_db=TRANSLITERATION_CACHE_DB)
 
 build_geonames_database(GEONAMES_PATH, GEONAMES_DB)